@@ -1,75 +1,275 @@
-from flask import Flask, render_template, request, redirect, url_for, flash, send_from_directory, abort, jsonify, make_response, Response  # type: ignore
+from flask import Flask, render_template, request, redirect, url_for, flash, send_from_directory, abort, jsonify, make_response, Response, g, has_request_context  # type: ignore
 from flask_login import LoginManager, login_user, logout_user, login_required, current_user  # type: ignore
 from flask_wtf.csrf import generate_csrf, CSRFProtect  # type: ignore
+from flask_caching import Cache  # type: ignore
+from sqlalchemy import func, event, select, bindparam  # type: ignore
+from sqlalchemy.exc import IntegrityError, DBAPIError  # type: ignore
+from jinja2 import FileSystemBytecodeCache  # type: ignore
 from werkzeug.utils import secure_filename  # type: ignore
-from functools import wraps
+from functools import wraps, lru_cache
+from concurrent.futures import ThreadPoolExecutor
 import os
+import io
+import re
+import shutil
+import sys
+import uuid
 import tempfile
-from datetime import datetime, date, timedelta
-from apscheduler.schedulers.background import BackgroundScheduler  # type: ignore
-from apscheduler.triggers.date import DateTrigger  # type: ignore
-import atexit
+from datetime import datetime, date, timedelta, timezone
+import time
 
 from config import Config
 from models import db, User, Musician, SundayService, ServiceMusician, Practice, PracticeMusician, Song, MusicianAvailability, Slide, ProfilePost, PracticeSong, PostLike, PostHeart, PostRepost, PostComment, EventAnnouncement, Notification, SMSLog, UserPermission, Journal, LeaveRequest, ActivityLog, Task, TaskOption, Tool, Message
-from sms_service import send_practice_assignment_sms, send_practice_reminder_sms, format_phone_number
 from forms import (
     LoginForm, MusicianForm, ServiceForm, ServiceMusicianForm,
     PracticeForm, PracticeMusicianForm, UserForm, SlideForm, ProfilePostForm, PostCommentForm, EventAnnouncementForm, ProfileCustomizationForm, PermissionForm, JournalForm, ToolForm
 )
 
+# Timezone objects used by the Manila time filters (built once, not per call)
+try:
+    import pytz  # type: ignore
+    _UTC = pytz.UTC
+    _MANILA_TZ = pytz.timezone('Asia/Manila')
+except ImportError:
+    # Fallback: manila_time adds 8 hours manually if pytz is not available
+    _UTC = None
+    _MANILA_TZ = None
+
 app = Flask(__name__)
 app.config.from_object(Config)
 csrf = CSRFProtect(app)
+cache = Cache(app)
+
+# Persist compiled template bytecode so restarted workers don't re-parse every template
+# (template auto-reload already follows app.debug, so it stays off in production)
+jinja_cache_dir = os.path.join(tempfile.gettempdir(), 'team_zac_jinja_cache')
+os.makedirs(jinja_cache_dir, exist_ok=True)
+app.jinja_env.bytecode_cache = FileSystemBytecodeCache(jinja_cache_dir)
+
+# Create profile upload folders once at startup instead of on every upload
+for folder_key in ('POSTS_FOLDER', 'PROFILE_PICTURES_FOLDER', 'BANNERS_FOLDER'):
+    os.makedirs(app.config[folder_key], exist_ok=True)
+
+# Profile upload locations resolved once (app.static_folder is recomputed on every access)
+STATIC_FOLDER = app.static_folder
+POSTS_FOLDER = app.config['POSTS_FOLDER']
+PROFILE_PICTURES_FOLDER = app.config['PROFILE_PICTURES_FOLDER']
+BANNERS_FOLDER = app.config['BANNERS_FOLDER']
+# Paths stored on the models are relative to the static folder
+POSTS_STATIC_PREFIX = 'profiles/posts/'
+PROFILE_PICTURES_STATIC_PREFIX = 'profiles/pictures/'
+BANNERS_STATIC_PREFIX = 'profiles/banners/'
+
+# Resolved once: older databases may predate Notification.leave_request_id (see migrate_database)
+NOTIFICATION_HAS_LEAVE_REQUEST_ID = 'leave_request_id' in Notification.__table__.c
+
+LEAVE_REQUESTS_PER_PAGE = 50
+
+# Hot list queries, built once with bind parameters so every request reuses the
+# same statement (and its compiled SQL from the engine's query cache)
+ANNOUNCEMENT_LIST_STMT = select(
+    EventAnnouncement.id, EventAnnouncement.title, EventAnnouncement.caption,
+    EventAnnouncement.image_path, EventAnnouncement.is_active,
+    EventAnnouncement.display_order, EventAnnouncement.created_at
+).order_by(EventAnnouncement.display_order, EventAnnouncement.created_at.desc())
+
+TOOL_LIST_STMT = select(
+    Tool.id, Tool.name, Tool.link, Tool.description, Tool.screenshot, Tool.developer_name
+).order_by(Tool.created_at.desc())
+
+_TODAY_TASKS = select(
+    Task.id, Task.task, Task.priority, Task.completed_at
+).where(
+    Task.user_id == bindparam('user_id'),
+    Task.task_date == bindparam('task_date')
+).order_by(Task.priority.asc(), Task.created_at.asc())
+TODAY_PENDING_TASKS_STMT = _TODAY_TASKS.where(Task.is_completed.isnot(True))
+TODAY_COMPLETED_TASKS_STMT = _TODAY_TASKS.where(Task.is_completed.is_(True))
+
+TASK_OPTIONS_STMT = select(
+    TaskOption.id, TaskOption.task_text
+).where(TaskOption.user_id == bindparam('user_id')).order_by(TaskOption.created_at.desc())
+
+USER_PERMISSION_STMT = select(UserPermission).where(
+    UserPermission.user_id == bindparam('user_id'),
+    UserPermission.permission_type == bindparam('permission_type')
+)
+
+@cache.memoize(timeout=30)
+def _unread_notification_count(user_id):
+    """Count unread notifications for a user (cached briefly, cleared when notifications are read or created)"""
+    return db.session.query(func.count(Notification.id)).filter(
+        Notification.user_id == user_id,
+        Notification.is_read == False
+    ).scalar() or 0
+
+
+def mark_notification_recipients(user_ids=None):
+    """Note whose unread count a pending notification insert changes (None means every user).
+    
+    Core INSERTs don't fire mapper events, so bulk-insert call sites report their recipients
+    here; the cached counts are cleared once the transaction commits.
+    """
+    recipients = db.session.info.setdefault('notification_recipients', set())
+    if user_ids is None:
+        recipients.add(None)
+    else:
+        recipients.update(user_ids)
+
+
+def _mark_inserted_notification(mapper, connection, target):
+    mark_notification_recipients([target.user_id])
+
+
+def _clear_notified_unread_counts(session):
+    recipients = session.info.pop('notification_recipients', None)
+    if not recipients:
+        return
+    if None in recipients:
+        cache.delete_memoized(_unread_notification_count)
+    else:
+        for user_id in recipients:
+            cache.delete_memoized(_unread_notification_count, user_id)
+
+
+def _forget_notification_recipients(session, previous_transaction):
+    if not previous_transaction.nested:
+        session.info.pop('notification_recipients', None)
+
+
+event.listen(Notification, 'after_insert', _mark_inserted_notification)
+event.listen(db.session, 'after_commit', _clear_notified_unread_counts)
+event.listen(db.session, 'after_soft_rollback', _forget_notification_recipients)
+
+
+@cache.memoize(timeout=60)
+def _musician_choices():
+    """(id, name) choices for the service musician dropdown (cached, cleared on any musician change)"""
+    return [tuple(row) for row in db.session.query(Musician.id, Musician.name).order_by(Musician.name).all()]
+
+
+def _clear_musician_choices(mapper, connection, target):
+    cache.delete_memoized(_musician_choices)
+
+
+for _event_name in ('after_insert', 'after_update', 'after_delete'):
+    event.listen(Musician, _event_name, _clear_musician_choices)
+
+
+@cache.memoize(timeout=60)
+def _user_display_names():
+    """User display names in username order for contributor dropdowns (cached, cleared on any user change)"""
+    rows = db.session.query(User.username, User.nickname).order_by(User.username).all()
+    return [nickname if nickname else username for username, nickname in rows]
+
+
+def _clear_user_display_names(mapper, connection, target):
+    cache.delete_memoized(_user_display_names)
+
+
+for _event_name in ('after_insert', 'after_update', 'after_delete'):
+    event.listen(User, _event_name, _clear_user_display_names)
+
+
+def db_error_message(error):
+    """Lower-cased DBAPI message of a database error, or '' for anything else
+    
+    Checks only the driver's message rather than str() of the SQLAlchemy exception,
+    which also renders the SQL statement and bound parameters.
+    """
+    if not isinstance(error, DBAPIError) or error.orig is None or not error.orig.args:
+        return ''
+    return str(error.orig.args[0]).lower()
+
+
+def upsert_availability(musician_id, date_value, is_available, notes):
+    """Insert or update a musician's availability for a date in one statement
+    
+    Relies on the unique_musician_date constraint; PostgreSQL and SQLite share the
+    ON CONFLICT DO UPDATE syntax.
+    """
+    if db.engine.dialect.name == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert  # type: ignore
+    else:
+        from sqlalchemy.dialects.sqlite import insert  # type: ignore
+    stmt = insert(MusicianAvailability).values(
+        musician_id=musician_id,
+        date=date_value,
+        is_available=is_available,
+        notes=notes
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=['musician_id', 'date'],
+        set_={'is_available': stmt.excluded.is_available, 'notes': stmt.excluded.notes}
+    )
+    db.session.execute(stmt)
+
+
+def current_user_is_worship_leader():
+    """current_user.is_worship_leader(), resolved at most once per request"""
+    if '_is_worship_leader' not in g:
+        g._is_worship_leader = current_user.is_worship_leader()
+    return g._is_worship_leader
+
+
+def current_user_is_team_leader():
+    """current_user.is_team_leader(), resolved at most once per request"""
+    if '_is_team_leader' not in g:
+        g._is_team_leader = current_user.is_team_leader()
+    return g._is_team_leader
+
+
+def get_unread_notification_count():
+    """Unread notification count for the current user, computed at most once per request"""
+    if '_unread_notification_count' not in g:
+        g._unread_notification_count = _unread_notification_count(current_user.id)
+    return g._unread_notification_count
 
-# Initialize APScheduler for SMS reminders
-# Only start scheduler once, not on every reload in debug mode
-scheduler = None
-if not app.debug or os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
-    try:
-        scheduler = BackgroundScheduler()
-        if not scheduler.running:
-            scheduler.start()
-        atexit.register(lambda: scheduler.shutdown() if scheduler and scheduler.running else None)
-    except Exception as e:
-        print(f"Warning: Could not start scheduler: {e}")
-        scheduler = None
 
 # Make CSRF token helper available in all templates
 @app.context_processor
 def inject_csrf_token():
     def get_csrf_token():
-        return generate_csrf()
+        # Templates call this once per form; build the token only once per request
+        if '_csrf_token' not in g:
+            g._csrf_token = generate_csrf()
+        return g._csrf_token
     
     # Also inject unread notification count for authenticated users
     unread_notification_count = 0
     if current_user.is_authenticated:
-        unread_notification_count = Notification.query.filter_by(user_id=current_user.id, is_read=False).count()
+        unread_notification_count = get_unread_notification_count()
     
     return dict(
         get_csrf_token=get_csrf_token,
         unread_notification_count=unread_notification_count
     )
 
+# Special-case instrument names (normalized) and their display labels
+_INSTRUMENT_SUFFIX_MAP = {
+    'drums': 'Drummer',
+    'drum': 'Drummer',
+    'vocals': 'Vocalist',
+    'vocal': 'Vocalist',
+    'keyboard': 'Keyboardist',
+    'keyboards': 'Keyboardist',
+}
+
+
+@lru_cache(maxsize=256)
+def _format_instrument_cached(instrument):
+    """Resolve an instrument label - memoized since the set of instruments is tiny"""
+    # Add "player" suffix for other instruments
+    return _INSTRUMENT_SUFFIX_MAP.get(instrument.lower().strip(), f"{instrument} player")
+
+
 # Jinja2 filter to format instrument names
 @app.template_filter('format_instrument')
 def format_instrument(instrument):
     """Format instrument name with appropriate suffix"""
     if not instrument:
         return ""
-    
-    instrument_lower = instrument.lower().strip()
-    
-    # Special cases
-    if instrument_lower == 'drums' or instrument_lower == 'drum':
-        return 'Drummer'
-    elif instrument_lower == 'vocals' or instrument_lower == 'vocal':
-        return 'Vocalist'
-    elif instrument_lower == 'keyboard' or instrument_lower == 'keyboards':
-        return 'Keyboardist'
-    else:
-        # Add "player" suffix for other instruments
-        return f"{instrument} player"
+    return _format_instrument_cached(instrument)
 
 # Jinja2 filter to convert UTC datetime to Manila time
 @app.template_filter('bold_title')
@@ -92,22 +292,15 @@ def manila_time(dt):
     if not dt:
         return None
     
-    try:
-        # Try using pytz if available
-        import pytz  # type: ignore
-        utc = pytz.UTC
-        manila_tz = pytz.timezone('Asia/Manila')
-        
+    if _MANILA_TZ is not None:
         # If datetime is naive, assume it's UTC
         if dt.tzinfo is None:
-            dt = utc.localize(dt)
+            dt = _UTC.localize(dt)
         
         # Convert to Manila time
-        manila_dt = dt.astimezone(manila_tz)
-        return manila_dt
-    except ImportError:
+        return dt.astimezone(_MANILA_TZ)
+    else:
         # Fallback: manually add 8 hours if pytz is not available
-        from datetime import timedelta, timezone
         if dt.tzinfo is None:
             # Assume UTC if naive, add 8 hours
             return dt + timedelta(hours=8)
@@ -118,6 +311,14 @@ def manila_time(dt):
             # Add 8 hours for Manila time
             return utc_dt.replace(tzinfo=None) + timedelta(hours=8)
 
+@lru_cache(maxsize=4096)
+def _format_manila_cached(dt, format_string):
+    """Cached Manila conversion + strftime for a given (datetime, format) pair"""
+    manila_dt = manila_time(dt)
+    if manila_dt:
+        return manila_dt.strftime(format_string)
+    return ''
+
 # Helper function to format Manila time (available in templates)
 @app.template_filter('format_manila_time')
 def format_manila_time_filter(dt, format_string=None):
@@ -129,10 +330,7 @@ def format_manila_time_filter(dt, format_string=None):
         return ''
     if format_string is None:
         format_string = '%B %d, %Y at %I:%M %p'
-    manila_dt = manila_time(dt)
-    if manila_dt:
-        return manila_dt.strftime(format_string)
-    return ''
+    return _format_manila_cached(dt, format_string)
 
 @app.context_processor
 def inject_manila_time_formatter():
@@ -141,10 +339,7 @@ def inject_manila_time_formatter():
         """Format datetime in Manila time"""
         if not dt:
             return ''
-        manila_dt = manila_time(dt)
-        if manila_dt:
-            return manila_dt.strftime(format_string)
-        return ''
+        return _format_manila_cached(dt, format_string)
     return dict(format_manila_time_func=format_manila_time_func)
 
 # Initialize extensions
@@ -240,26 +435,158 @@ def logout():
         return redirect(url_for('login'))
 
 
+# Helper function to save uploaded files
+UPLOAD_COPY_BUFFER_SIZE = 1024 * 1024  # 1MB chunks instead of FileStorage.save's 16KB default
+VIDEO_UPLOAD_COPY_BUFFER_SIZE = 4 * 1024 * 1024  # Videos are large enough to benefit from bigger chunks
+
+def sendfile_upload(stream, dst):
+    """Copy an upload that Werkzeug already spooled to disk with os.sendfile (Linux only)
+    
+    Returns False when the stream isn't backed by a real file so the caller can fall back.
+    """
+    if not sys.platform.startswith('linux') or not hasattr(os, 'sendfile'):
+        return False
+    # Small uploads stay in memory; asking for fileno() would force them onto disk first
+    if getattr(stream, '_rolled', True) is False:
+        return False
+    try:
+        src_fd = stream.fileno()
+        offset = stream.tell()
+    except (OSError, ValueError, AttributeError):
+        return False
+    remaining = os.fstat(src_fd).st_size - offset
+    while remaining > 0:
+        sent = os.sendfile(dst.fileno(), src_fd, offset, remaining)
+        if sent == 0:
+            break
+        offset += sent
+        remaining -= sent
+    return True
+
+
+def save_upload(file, file_path, buffer_size=UPLOAD_COPY_BUFFER_SIZE):
+    """Stream an uploaded file to file_path via a temp file so a failed upload never leaves a partial file"""
+    tmp = tempfile.NamedTemporaryFile(dir=os.path.dirname(file_path), delete=False)
+    try:
+        with tmp:
+            if not sendfile_upload(file.stream, tmp):
+                shutil.copyfileobj(file.stream, tmp, length=buffer_size)
+        # NamedTemporaryFile is created owner-only; uploads are served as static files
+        os.chmod(tmp.name, 0o644)
+        os.replace(tmp.name, file_path)
+    except Exception:
+        safe_unlink(tmp.name, 'temporary upload')
+        raise
+
+
+def safe_unlink(path, label='file'):
+    """Delete a file if present - the ENOENT from os.remove is the existence check"""
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        print(f"Error deleting {label}: {e}")
+
+
+# Small pool for fire-and-forget file deletes so requests don't wait on storage
+file_io_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix='fileio')
+
+def unlink_in_background(path, label='file'):
+    """Queue safe_unlink on the file I/O pool; call after the DB commit with an absolute path"""
+    file_io_pool.submit(safe_unlink, path, label)
+
+
+def delete_media_batch(relpaths):
+    """Delete static-relative media files, scanning each directory once instead of probing every file"""
+    files_by_dir = {}
+    for relpath in relpaths:
+        directory, name = os.path.split(os.path.join(STATIC_FOLDER, relpath))
+        files_by_dir.setdefault(directory, set()).add(name)
+    
+    for directory, names in files_by_dir.items():
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if entry.name in names:
+                        safe_unlink(entry.path, 'media file')
+        except FileNotFoundError:
+            continue
+
+
 # Helper function to log activities
 def log_activity(activity_type, actor_id, description, target_user_id=None, slide_id=None, leave_request_id=None, metadata=None):
     """Log an activity to the activity log"""
     try:
         import json
-        activity = ActivityLog(
-            activity_type=activity_type,
-            actor_id=actor_id,
-            target_user_id=target_user_id,
-            description=description,
-            slide_id=slide_id,
-            leave_request_id=leave_request_id,
-            extra_data=json.dumps(metadata) if metadata else None
-        )
-        db.session.add(activity)
-        db.session.commit()
+        activity = {
+            'activity_type': activity_type,
+            'actor_id': actor_id,
+            'target_user_id': target_user_id,
+            'description': description,
+            'slide_id': slide_id,
+            'leave_request_id': leave_request_id,
+            'extra_data': json.dumps(metadata) if metadata else None,
+            'created_at': datetime.utcnow()
+        }
+        if has_request_context():
+            # Defer the write until the request is done; teardown hands it to a background thread
+            if not hasattr(g, '_pending_activities'):
+                g._pending_activities = []
+            g._pending_activities.append(activity)
+            return
+        write_activities([activity])
     except Exception as e:
         # Don't fail the main operation if logging fails
         print(f"Error logging activity: {e}")
-        db.session.rollback()
+
+
+# Single worker so activity rows are written in the order they were logged
+activity_log_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix='activitylog')
+
+def write_activities(rows):
+    """Insert activity log rows in one multi-row INSERT on their own session"""
+    with app.app_context():
+        try:
+            db.session.execute(ActivityLog.__table__.insert(), rows)
+            db.session.commit()
+        except Exception as e:
+            # Don't fail the main operation if logging fails
+            print(f"Error logging activity: {e}")
+            db.session.rollback()
+
+
+def _keep_committed_activities(session):
+    """Activities logged before a successful commit describe changes that happened; keep them"""
+    if has_request_context() and g.get('_pending_activities'):
+        g.setdefault('_committed_activities', []).extend(g.pop('_pending_activities'))
+
+
+def _drop_rolled_back_activities(session, previous_transaction):
+    """Activities logged since the last commit describe changes that were just rolled back"""
+    if has_request_context() and not previous_transaction.nested:
+        g.pop('_pending_activities', None)
+
+
+event.listen(db.session, 'after_commit', _keep_committed_activities)
+event.listen(db.session, 'after_soft_rollback', _drop_rolled_back_activities)
+
+
+@app.teardown_request
+def flush_pending_activities(exception=None):
+    """Queue activity log entries collected by log_activity during this request.
+    
+    Entries followed by a commit are always written. Entries logged after the last commit
+    are written only if the request finished without an exception, since handlers may log
+    once the work is already committed; anything logged before a rollback was dropped by
+    _drop_rolled_back_activities.
+    """
+    activities = g.pop('_committed_activities', [])
+    pending = g.pop('_pending_activities', None)
+    if pending and exception is None:
+        activities.extend(pending)
+    if activities:
+        activity_log_pool.submit(write_activities, activities)
 
 
 # Dashboard
@@ -274,12 +601,14 @@ def dashboard():
     ).order_by(SundayService.date).limit(5).all()
     
     # Get only the latest upcoming practice with eager loading
-    from sqlalchemy.orm import joinedload  # type: ignore
+    # Collections use selectinload (one IN query each) so musicians x songs
+    # don't multiply into a single cartesian JOIN result
+    from sqlalchemy.orm import joinedload, selectinload  # type: ignore
     from models import PracticeMusician, PracticeSong
     latest_practice = Practice.query.options(
-        joinedload(Practice.musicians).joinedload(PracticeMusician.musician),
-        joinedload(Practice.songs).joinedload(PracticeSong.song),
-        joinedload(Practice.songs).joinedload(PracticeSong.preparer)
+        selectinload(Practice.musicians).joinedload(PracticeMusician.musician),
+        selectinload(Practice.songs).joinedload(PracticeSong.song),
+        selectinload(Practice.songs).joinedload(PracticeSong.preparer)
     ).filter(
         Practice.date >= today
     ).order_by(Practice.date).first()
@@ -288,14 +617,18 @@ def dashboard():
     user_assignment_info = None
     if latest_practice:
         # Get or create team member profile for current user if needed
-        if not current_user.musician:
+        # Read the relationship once and commit at most once for the whole block
+        musician = current_user.musician
+        role_instrument = current_user.role if current_user.role in ['case_manager', 'shipment_coordinator', 'data_analyst', 'team_leader'] else None
+        musician_changed = False
+        if not musician:
             musician = Musician(
                 name=current_user.get_display_name(),
                 user_id=current_user.id,
-                instruments=current_user.role if current_user.role in ['case_manager', 'shipment_coordinator', 'data_analyst', 'team_leader'] else None
+                instruments=role_instrument
             )
             db.session.add(musician)
-            db.session.commit()
+            musician_changed = True
             
             # Log activity for new member
             log_activity(
@@ -305,25 +638,28 @@ def dashboard():
                 description=f"{current_user.get_display_name()} joined the team as a new member",
                 metadata={'role': current_user.role or 'member'}
             )
-        elif not current_user.musician.instruments and current_user.role in ['case_manager', 'shipment_coordinator', 'data_analyst', 'team_leader']:
+        elif not musician.instruments and role_instrument:
             # Sync role if musician profile exists but doesn't have a role set
-            current_user.musician.instruments = current_user.role
+            musician.instruments = role_instrument
+            musician_changed = True
+        
+        if musician_changed:
             db.session.commit()
-            musician = current_user.musician
-        else:
-            musician = current_user.musician
         
         # Check if user is assigned to this practice
-        # Query PracticeMusician directly to ensure we get all assignments
-        practice_assignments = PracticeMusician.query.filter_by(practice_id=latest_practice.id).all()
-        for assignment in practice_assignments:
-            if assignment.musician and assignment.musician_id == musician.id:
-                user_assignment_info = {
-                    'instrument': assignment.instrument,
-                    'nickname': current_user.get_display_name(),
-                    'date': latest_practice.date.strftime('%B %d, %Y')
-                }
-                break
+        # Look up only this user's assignment row instead of scanning every assignment
+        # In debug mode, raise on any lazy load so N+1 regressions surface during development
+        from sqlalchemy.orm import raiseload  # type: ignore
+        assignment_options = [raiseload('*')] if app.debug else []
+        assignment = PracticeMusician.query.options(
+            *assignment_options
+        ).filter_by(practice_id=latest_practice.id, musician_id=musician.id).first()
+        if assignment:
+            user_assignment_info = {
+                'instrument': assignment.instrument,
+                'nickname': current_user.get_display_name(),
+                'date': latest_practice.date.strftime('%B %d, %Y')
+            }
     
     # Get newly added musicians (created within the last 30 days)
     # Only include musicians that have a valid user_id pointing to an existing User
@@ -332,58 +668,57 @@ def dashboard():
     from sqlalchemy.orm import joinedload  # type: ignore
     thirty_days_ago = datetime.utcnow() - timedelta(days=30)
     
-    # Get all valid user IDs
-    valid_user_ids = [user.id for user in User.query.all()]
-    
-    # Filter to only include musicians with valid user_id that exists in User table
-    all_new_musicians = Musician.query.options(
-        joinedload(Musician.user)
+    # Collapse duplicate rows per user in SQL: keep the newest musician row and
+    # aggregate the other rows' instruments/pictures alongside it
+    def split_instruments(value):
+        return {inst.strip() for inst in value.split(',') if inst.strip()} if value else set()
+    
+    per_user = db.session.query(
+        func.max(Musician.id).label('musician_id'),
+        func.count(Musician.id).label('row_count'),
+        func.aggregate_strings(Musician.instruments, ',').label('all_instruments'),
+        func.max(Musician.profile_picture).label('any_profile_picture'),
+        func.max(Musician.banner).label('any_banner')
     ).filter(
         Musician.created_at >= thirty_days_ago,
         Musician.user_id.isnot(None)  # Must have a user_id
+    ).group_by(Musician.user_id).subquery()
+    
+    new_musician_rows = db.session.query(
+        Musician, per_user.c.row_count, per_user.c.all_instruments,
+        per_user.c.any_profile_picture, per_user.c.any_banner
+    ).join(
+        per_user, Musician.id == per_user.c.musician_id
+    ).options(
+        joinedload(Musician.user)
     ).order_by(Musician.created_at.desc()).all()
     
-    # Filter to ensure user actually exists and is valid
-    all_new_musicians = [m for m in all_new_musicians if m.user_id and m.user_id in valid_user_ids and m.user is not None]
-    
-    # Group musicians by user_id or display name to avoid duplicates and combine instruments
+    # Group the per-user rows by display name to avoid duplicates and combine instruments
     musician_dict = {}
+    musicians_by_display_name = {}
     
-    for musician in all_new_musicians:
-        display_name = musician.get_display_name().strip().lower() if musician.get_display_name() else musician.name.strip().lower()
-        
-        # Find existing entry by user_id or display name
-        existing_musician = None
-        existing_key = None
-        
-        # First, check if we already have this user_id
-        if musician.user_id:
-            for key, existing in musician_dict.items():
-                if existing.user_id == musician.user_id:
-                    existing_musician = existing
-                    existing_key = key
-                    break
-        
-        # If not found by user_id, check by display name
-        if not existing_musician:
-            for key, existing in musician_dict.items():
-                existing_display = existing.get_display_name().strip().lower() if existing.get_display_name() else existing.name.strip().lower()
-                if existing_display == display_name:
-                    existing_musician = existing
-                    existing_key = key
-                    break
+    for musician, row_count, all_instruments, any_profile_picture, any_banner in new_musician_rows:
+        # The joined user row proves the user_id points at an existing User
+        if musician.user is None:
+            continue
+        
+        if row_count > 1:
+            # Same user had several rows - merge their instruments and fill missing images
+            combined_instruments = ', '.join(sorted(split_instruments(all_instruments)))
+            musician.instruments = combined_instruments if combined_instruments else None
+            if not musician.profile_picture:
+                musician.profile_picture = any_profile_picture
+            if not musician.banner:
+                musician.banner = any_banner
+        
+        display_name = (musician.get_display_name() or musician.name).strip().lower()
+        existing_musician = musicians_by_display_name.get(display_name)
         
         if existing_musician:
             # Duplicate found - combine instruments
-            existing_instruments = set()
-            new_instruments = set()
-            
-            if existing_musician.instruments:
-                existing_instruments = {inst.strip() for inst in existing_musician.instruments.split(',') if inst.strip()}
-            if musician.instruments:
-                new_instruments = {inst.strip() for inst in musician.instruments.split(',') if inst.strip()}
-            
-            combined_instruments = ', '.join(sorted(existing_instruments | new_instruments))
+            combined_instruments = ', '.join(sorted(
+                split_instruments(existing_musician.instruments) | split_instruments(musician.instruments)
+            ))
             existing_musician.instruments = combined_instruments if combined_instruments else None
             
             # Also merge other fields if the existing one is missing them
@@ -393,12 +728,8 @@ def dashboard():
                 existing_musician.banner = musician.banner
         else:
             # New musician - add to dict
-            # Use user_id as key if available, otherwise use display name
-            if musician.user_id:
-                key = f"user_{musician.user_id}"
-            else:
-                key = f"name_{display_name}"
-            musician_dict[key] = musician
+            musician_dict[f"user_{musician.user_id}"] = musician
+            musicians_by_display_name[display_name] = musician
     
     # Convert to list - no limit on number of profiles
     new_musicians = list(musician_dict.values())
@@ -436,16 +767,18 @@ def dashboard():
 @app.route('/fba-copy')
 @login_required
 def fba_copy():
+    from sqlalchemy.orm import joinedload  # type: ignore
     # Show all users, not just those with team member profiles
-    users_list = User.query.order_by(User.username).all()
+    users_list = User.query.options(joinedload(User.musician)).order_by(User.username).all()
     
-    # Sync all musician names with their user display names
-    updated_count = 0
-    for user in users_list:
-        if user.musician and user.musician.name != user.get_display_name():
-            user.musician.name = user.get_display_name()
-            updated_count += 1
-    if updated_count > 0:
+    # Sync all musician names with their user display names in a single batched UPDATE
+    name_updates = [
+        {'id': user.musician.id, 'name': user.get_display_name()}
+        for user in users_list
+        if user.musician and user.musician.name != user.get_display_name()
+    ]
+    if name_updates:
+        db.session.bulk_update_mappings(Musician, name_updates)
         db.session.commit()
     
     return render_template('fba_copy.html', users=users_list)
@@ -545,22 +878,20 @@ def create_profile_post(id):
             file = form.image.data
             # Check if it's a file object (has filename attribute) and not a string
             if hasattr(file, 'filename') and file.filename:
-                filename = secure_filename(f"post_img_{musician.id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{file.filename}")
-                os.makedirs(app.config['POSTS_FOLDER'], exist_ok=True)
-                file_path = os.path.join(app.config['POSTS_FOLDER'], filename)
-                file.save(file_path)
-                post.image_path = f"profiles/posts/{filename}"
+                filename = f"post_img_{musician.id}_{uuid.uuid4().hex}_{secure_filename(file.filename)}"
+                file_path = os.path.join(POSTS_FOLDER, filename)
+                save_upload(file, file_path)
+                post.image_path = POSTS_STATIC_PREFIX + filename
         
         # Handle video upload
         if form.video.data:
             file = form.video.data
             # Check if it's a file object (has filename attribute) and not a string
             if hasattr(file, 'filename') and file.filename:
-                filename = secure_filename(f"post_vid_{musician.id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{file.filename}")
-                os.makedirs(app.config['POSTS_FOLDER'], exist_ok=True)
-                file_path = os.path.join(app.config['POSTS_FOLDER'], filename)
-                file.save(file_path)
-                post.video_path = f"profiles/posts/{filename}"
+                filename = f"post_vid_{musician.id}_{uuid.uuid4().hex}_{secure_filename(file.filename)}"
+                file_path = os.path.join(POSTS_FOLDER, filename)
+                save_upload(file, file_path, VIDEO_UPLOAD_COPY_BUFFER_SIZE)
+                post.video_path = POSTS_STATIC_PREFIX + filename
         
         # Ensure at least content, image, or video is provided
         if not post.content and not post.image_path and not post.video_path:
@@ -606,9 +937,11 @@ def my_profile():
 @login_required
 def view_musician_profile(id):
     """View team member profile in a modern social media style"""
-    # Force a fresh query to avoid cached data
-    db.session.expire_all()
+    from sqlalchemy.orm import contains_eager  # type: ignore
     musician = Musician.query.get_or_404(id)
+    # Reload the row only when the caller explicitly asks for fresh data
+    if request.args.get('refresh') == '1':
+        db.session.refresh(musician)
     user = musician.user if musician.user_id else None
     
     # Sync musician name with user's display name if they differ
@@ -616,25 +949,32 @@ def view_musician_profile(id):
         musician.name = user.get_display_name()
         db.session.commit()
     
-    # Get upcoming services for this musician
+    # Get the next 5 upcoming services for this musician (filtered, sorted and limited in SQL)
     from datetime import date
     today = date.today()
-    upcoming_services = []
-    
-    for assignment in musician.service_assignments:
-        if assignment.service and assignment.service.date >= today:
-            upcoming_services.append({
-                'date': assignment.service.date,
-                'theme': assignment.service.theme,
-                'instrument': assignment.instrument,
-                'role': assignment.role
-            })
+    upcoming_assignments = ServiceMusician.query.join(
+        SundayService, ServiceMusician.service_id == SundayService.id
+    ).options(
+        contains_eager(ServiceMusician.service)
+    ).filter(
+        ServiceMusician.musician_id == musician.id,
+        SundayService.date >= today
+    ).order_by(SundayService.date).limit(5).all()
     
-    # Sort by date
-    upcoming_services.sort(key=lambda x: x['date'])
+    upcoming_services = [{
+        'date': assignment.service.date,
+        'theme': assignment.service.theme,
+        'instrument': assignment.instrument,
+        'role': assignment.role
+    } for assignment in upcoming_assignments]
     
     # Get posts for this musician (most recent first)
-    posts = ProfilePost.query.filter_by(musician_id=musician.id).order_by(ProfilePost.created_at.desc()).all()
+    from sqlalchemy.orm import undefer  # type: ignore
+    posts = ProfilePost.query.options(
+        undefer(ProfilePost.like_count),
+        undefer(ProfilePost.heart_count),
+        undefer(ProfilePost.share_count)
+    ).filter_by(musician_id=musician.id).order_by(ProfilePost.created_at.desc()).all()
     
     # Track profile views (only if not viewing own profile)
     if current_user.is_authenticated:
@@ -650,7 +990,7 @@ def view_musician_profile(id):
     return render_template('musician_profile.html', 
                          musician=musician, 
                          user=user,
-                         upcoming_services=upcoming_services[:5],
+                         upcoming_services=upcoming_services,
                          posts=posts,
                          can_edit=can_edit,
                          post_form=form,
@@ -690,22 +1030,20 @@ def edit_musician(id):
             file = form.profile_picture.data
             # Check if it's a file object (has filename attribute) and not a string
             if hasattr(file, 'filename') and file.filename:
-                filename = secure_filename(f"profile_{musician.id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{file.filename}")
-                os.makedirs(app.config['PROFILE_PICTURES_FOLDER'], exist_ok=True)
-                file_path = os.path.join(app.config['PROFILE_PICTURES_FOLDER'], filename)
-                file.save(file_path)
-                musician.profile_picture = f"profiles/pictures/{filename}"
+                filename = f"profile_{musician.id}_{uuid.uuid4().hex}_{secure_filename(file.filename)}"
+                file_path = os.path.join(PROFILE_PICTURES_FOLDER, filename)
+                save_upload(file, file_path)
+                musician.profile_picture = PROFILE_PICTURES_STATIC_PREFIX + filename
         
         # Handle banner upload
         if form.banner.data:
             file = form.banner.data
             # Check if it's a file object (has filename attribute) and not a string
             if hasattr(file, 'filename') and file.filename:
-                filename = secure_filename(f"banner_{musician.id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{file.filename}")
-                os.makedirs(app.config['BANNERS_FOLDER'], exist_ok=True)
-                file_path = os.path.join(app.config['BANNERS_FOLDER'], filename)
-                file.save(file_path)
-                musician.banner = f"profiles/banners/{filename}"
+                filename = f"banner_{musician.id}_{uuid.uuid4().hex}_{secure_filename(file.filename)}"
+                file_path = os.path.join(BANNERS_FOLDER, filename)
+                save_upload(file, file_path)
+                musician.banner = BANNERS_STATIC_PREFIX + filename
         
         db.session.commit()
         flash('Profile updated successfully.', 'success')
@@ -717,11 +1055,12 @@ def edit_musician(id):
 @login_required
 def edit_musician_picture(id):
     """Quick edit for profile picture and banner only"""
-    musician = Musician.query.get_or_404(id)
+    from sqlalchemy.orm import joinedload  # type: ignore
+    musician = Musician.query.options(joinedload(Musician.user)).filter_by(id=id).first_or_404()
     user = musician.user if musician.user_id else None
     
     # Check permissions
-    can_edit = (user and current_user.id == user.id) or current_user.is_worship_leader()
+    can_edit = (user and current_user.id == user.id) or current_user_is_worship_leader()
     if not can_edit:
         flash('You do not have permission to edit this profile.', 'danger')
         return redirect(url_for('view_musician_profile', id=id))
@@ -730,24 +1069,22 @@ def edit_musician_picture(id):
     # Only show profile picture and banner fields
     if request.method == 'POST':
         if form.validate_on_submit():
+            # Old files are removed after the commit so the profile never points at a missing file
+            replaced_files = []
+            
             # Handle profile picture upload
             if form.profile_picture.data:
                 file = form.profile_picture.data
                 if hasattr(file, 'filename') and file.filename:
                     # Delete old profile picture if exists
                     if musician.profile_picture:
-                        old_file_path = os.path.join(app.static_folder, musician.profile_picture)
-                        if os.path.exists(old_file_path):
-                            try:
-                                os.remove(old_file_path)
-                            except Exception as e:
-                                print(f"Error deleting old profile picture: {e}")
+                        old_file_path = os.path.join(STATIC_FOLDER, musician.profile_picture)
+                        replaced_files.append((old_file_path, 'old profile picture'))
                     
-                    filename = secure_filename(f"profile_{musician.id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{file.filename}")
-                    os.makedirs(app.config['PROFILE_PICTURES_FOLDER'], exist_ok=True)
-                    file_path = os.path.join(app.config['PROFILE_PICTURES_FOLDER'], filename)
-                    file.save(file_path)
-                    musician.profile_picture = f"profiles/pictures/{filename}"
+                    filename = f"profile_{musician.id}_{uuid.uuid4().hex}_{secure_filename(file.filename)}"
+                    file_path = os.path.join(PROFILE_PICTURES_FOLDER, filename)
+                    save_upload(file, file_path)
+                    musician.profile_picture = PROFILE_PICTURES_STATIC_PREFIX + filename
             
             # Handle banner upload
             if form.banner.data:
@@ -755,20 +1092,17 @@ def edit_musician_picture(id):
                 if hasattr(file, 'filename') and file.filename:
                     # Delete old banner if exists
                     if musician.banner:
-                        old_file_path = os.path.join(app.static_folder, musician.banner)
-                        if os.path.exists(old_file_path):
-                            try:
-                                os.remove(old_file_path)
-                            except Exception as e:
-                                print(f"Error deleting old banner: {e}")
+                        old_file_path = os.path.join(STATIC_FOLDER, musician.banner)
+                        replaced_files.append((old_file_path, 'old banner'))
                     
-                    filename = secure_filename(f"banner_{musician.id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{file.filename}")
-                    os.makedirs(app.config['BANNERS_FOLDER'], exist_ok=True)
-                    file_path = os.path.join(app.config['BANNERS_FOLDER'], filename)
-                    file.save(file_path)
-                    musician.banner = f"profiles/banners/{filename}"
+                    filename = f"banner_{musician.id}_{uuid.uuid4().hex}_{secure_filename(file.filename)}"
+                    file_path = os.path.join(BANNERS_FOLDER, filename)
+                    save_upload(file, file_path)
+                    musician.banner = BANNERS_STATIC_PREFIX + filename
             
             db.session.commit()
+            for old_file_path, label in replaced_files:
+                unlink_in_background(old_file_path, label)
             flash('Profile picture and banner updated successfully.', 'success')
             return redirect(url_for('view_musician_profile', id=id))
     
@@ -779,27 +1113,23 @@ def edit_musician_picture(id):
 @login_required
 def delete_profile_picture(id):
     """Delete profile picture"""
-    musician = Musician.query.get_or_404(id)
+    from sqlalchemy.orm import joinedload  # type: ignore
+    musician = Musician.query.options(joinedload(Musician.user)).filter_by(id=id).first_or_404()
     user = musician.user if musician.user_id else None
     
     # Check permissions
-    can_edit = (user and current_user.id == user.id) or current_user.is_worship_leader()
+    can_edit = (user and current_user.id == user.id) or current_user_is_worship_leader()
     if not can_edit:
         flash('You do not have permission to edit this profile.', 'danger')
         return redirect(url_for('view_musician_profile', id=id))
     
     if musician.profile_picture:
-        # Delete file from disk
-        file_path = os.path.join(app.static_folder, musician.profile_picture)
-        if os.path.exists(file_path):
-            try:
-                os.remove(file_path)
-            except Exception as e:
-                print(f"Error deleting profile picture: {e}")
+        file_path = os.path.join(STATIC_FOLDER, musician.profile_picture)
         
-        # Clear from database
+        # Clear from database, then delete file from disk in the background
         musician.profile_picture = None
         db.session.commit()
+        unlink_in_background(file_path, 'profile picture')
         flash('Profile picture deleted successfully.', 'success')
     else:
         flash('No profile picture to delete.', 'info')
@@ -811,27 +1141,23 @@ def delete_profile_picture(id):
 @login_required
 def delete_banner(id):
     """Delete banner image"""
-    musician = Musician.query.get_or_404(id)
+    from sqlalchemy.orm import joinedload  # type: ignore
+    musician = Musician.query.options(joinedload(Musician.user)).filter_by(id=id).first_or_404()
     user = musician.user if musician.user_id else None
     
     # Check permissions
-    can_edit = (user and current_user.id == user.id) or current_user.is_worship_leader()
+    can_edit = (user and current_user.id == user.id) or current_user_is_worship_leader()
     if not can_edit:
         flash('You do not have permission to edit this profile.', 'danger')
         return redirect(url_for('view_musician_profile', id=id))
     
     if musician.banner:
-        # Delete file from disk
-        file_path = os.path.join(app.static_folder, musician.banner)
-        if os.path.exists(file_path):
-            try:
-                os.remove(file_path)
-            except Exception as e:
-                print(f"Error deleting banner: {e}")
+        file_path = os.path.join(STATIC_FOLDER, musician.banner)
         
-        # Clear from database
+        # Clear from database, then delete file from disk in the background
         musician.banner = None
         db.session.commit()
+        unlink_in_background(file_path, 'banner')
         flash('Banner deleted successfully.', 'success')
     else:
         flash('No banner to delete.', 'info')
@@ -843,7 +1169,8 @@ def delete_banner(id):
 @login_required
 def customize_profile(id):
     """Friendster-like profile customization page"""
-    musician = Musician.query.get_or_404(id)
+    from sqlalchemy.orm import joinedload  # type: ignore
+    musician = Musician.query.options(joinedload(Musician.user)).filter_by(id=id).first_or_404()
     user = musician.user if musician.user_id else None
     
     # Check permissions - only profile owner can customize
@@ -856,12 +1183,8 @@ def customize_profile(id):
     if form.validate_on_submit():
         # Clear any existing background image
         if musician.background_image:
-            file_path = os.path.join(app.static_folder, musician.background_image)
-            if os.path.exists(file_path):
-                try:
-                    os.remove(file_path)
-                except Exception as e:
-                    print(f"Error deleting background image: {e}")
+            file_path = os.path.join(STATIC_FOLDER, musician.background_image)
+            safe_unlink(file_path, 'background image')
             musician.background_image = None
         
         # Update customization fields
@@ -892,8 +1215,26 @@ def customize_profile(id):
 @worship_leader_required
 def delete_musician(id):
     musician = Musician.query.get_or_404(id)
+    
+    # Collect the profile's media so the files don't outlive the rows (posts go via the ORM cascade)
+    from sqlalchemy import or_  # type: ignore
+    post_media = db.session.query(ProfilePost.image_path, ProfilePost.video_path).filter(
+        ProfilePost.musician_id == musician.id
+    ).all()
+    media_files = {path for row in post_media for path in row if path}
+    media_files.update(path for path in (musician.profile_picture, musician.banner, musician.background_image) if path)
+    if media_files:
+        # Shared posts on other walls reuse the original's media paths - keep those files
+        still_used = db.session.query(ProfilePost.image_path, ProfilePost.video_path).filter(
+            ProfilePost.musician_id != musician.id,
+            or_(ProfilePost.image_path.in_(media_files), ProfilePost.video_path.in_(media_files))
+        ).all()
+        media_files -= {path for row in still_used for path in row if path}
+    
     db.session.delete(musician)
     db.session.commit()
+    if media_files:
+        file_io_pool.submit(delete_media_batch, media_files)
     flash('Team member deleted successfully.', 'success')
     return redirect(url_for('musicians'))
 
@@ -903,7 +1244,10 @@ def delete_musician(id):
 @login_required
 def edit_profile_post(post_id):
     """Edit a profile post - only the post owner can edit"""
-    post = ProfilePost.query.get_or_404(post_id)
+    from sqlalchemy.orm import joinedload  # type: ignore
+    post = ProfilePost.query.options(
+        joinedload(ProfilePost.musician).joinedload(Musician.user)
+    ).filter_by(id=post_id).first_or_404()
     musician = post.musician
     user = musician.user if musician.user_id else None
     
@@ -920,21 +1264,19 @@ def edit_profile_post(post_id):
         if form.image.data:
             file = form.image.data
             if hasattr(file, 'filename') and file.filename:
-                filename = secure_filename(f"post_img_{musician.id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{file.filename}")
-                os.makedirs(app.config['POSTS_FOLDER'], exist_ok=True)
-                file_path = os.path.join(app.config['POSTS_FOLDER'], filename)
-                file.save(file_path)
-                post.image_path = f"profiles/posts/{filename}"
+                filename = f"post_img_{musician.id}_{uuid.uuid4().hex}_{secure_filename(file.filename)}"
+                file_path = os.path.join(POSTS_FOLDER, filename)
+                save_upload(file, file_path)
+                post.image_path = POSTS_STATIC_PREFIX + filename
         
         # Handle video upload
         if form.video.data:
             file = form.video.data
             if hasattr(file, 'filename') and file.filename:
-                filename = secure_filename(f"post_vid_{musician.id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{file.filename}")
-                os.makedirs(app.config['POSTS_FOLDER'], exist_ok=True)
-                file_path = os.path.join(app.config['POSTS_FOLDER'], filename)
-                file.save(file_path)
-                post.video_path = f"profiles/posts/{filename}"
+                filename = f"post_vid_{musician.id}_{uuid.uuid4().hex}_{secure_filename(file.filename)}"
+                file_path = os.path.join(POSTS_FOLDER, filename)
+                save_upload(file, file_path, VIDEO_UPLOAD_COPY_BUFFER_SIZE)
+                post.video_path = POSTS_STATIC_PREFIX + filename
         
         post.updated_at = datetime.utcnow()
         db.session.commit()
@@ -948,7 +1290,10 @@ def edit_profile_post(post_id):
 @login_required
 def delete_profile_post(post_id):
     """Delete a profile post - only the post owner can delete"""
-    post = ProfilePost.query.get_or_404(post_id)
+    from sqlalchemy.orm import joinedload  # type: ignore
+    post = ProfilePost.query.options(
+        joinedload(ProfilePost.musician).joinedload(Musician.user)
+    ).filter_by(id=post_id).first_or_404()
     musician = post.musician
     user = musician.user if musician.user_id else None
     
@@ -957,49 +1302,61 @@ def delete_profile_post(post_id):
         flash('You can only delete your own posts.', 'danger')
         return redirect(url_for('view_musician_profile', id=musician.id))
     
-    # Delete associated media files
+    # Collect associated media files; they are deleted in the background after the commit
+    media_files = []
     if post.image_path:
-        image_path = os.path.join(app.root_path, 'static', post.image_path)
-        if os.path.exists(image_path):
-            try:
-                os.remove(image_path)
-            except:
-                pass
+        media_files.append((os.path.join(STATIC_FOLDER, post.image_path), 'post image'))
     
     if post.video_path:
-        video_path = os.path.join(app.root_path, 'static', post.video_path)
-        if os.path.exists(video_path):
-            try:
-                os.remove(video_path)
-            except:
-                pass
+        media_files.append((os.path.join(STATIC_FOLDER, post.video_path), 'post video'))
     
     db.session.delete(post)
     db.session.commit()
+    for media_path, label in media_files:
+        unlink_in_background(media_path, label)
     flash('Post deleted successfully.', 'success')
     return redirect(url_for('view_musician_profile', id=musician.id))
 
 
+def get_post_reaction_state(post_id, user_id):
+    """Like/heart counts and the user's own reactions for a post, in a single SELECT"""
+    from sqlalchemy import select, exists  # type: ignore
+    row = db.session.execute(select(
+        ProfilePost.like_count.label('like_count'),
+        ProfilePost.heart_count.label('heart_count'),
+        exists().where(PostLike.post_id == post_id, PostLike.user_id == user_id).label('has_like'),
+        exists().where(PostHeart.post_id == post_id, PostHeart.user_id == user_id).label('has_heart')
+    ).where(ProfilePost.id == post_id)).one()
+    return {
+        'like_count': row.like_count,
+        'heart_count': row.heart_count,
+        'has_like': bool(row.has_like),
+        'has_heart': bool(row.has_heart)
+    }
+
+
 @app.route('/posts/<int:post_id>/like', methods=['POST'])
 @csrf.exempt
 @login_required
 def toggle_post_like(post_id):
     """Toggle like on a post - removes heart if exists"""
     post = ProfilePost.query.get_or_404(post_id)
-    existing_like = PostLike.query.filter_by(post_id=post_id, user_id=current_user.id).first()
-    existing_heart = PostHeart.query.filter_by(post_id=post_id, user_id=current_user.id).first()
     
-    if existing_like:
+    # Try to add the like first; the unique (post_id, user_id) constraint tells us if it already existed
+    try:
+        with db.session.begin_nested():
+            db.session.add(PostLike(post_id=post_id, user_id=current_user.id))
+        added = True
+    except IntegrityError:
+        added = False
+    
+    if not added:
         # Remove like
-        db.session.delete(existing_like)
+        PostLike.query.filter_by(post_id=post_id, user_id=current_user.id).delete(synchronize_session=False)
         action = 'unliked'
     else:
         # Remove heart if exists (can only have one reaction)
-        if existing_heart:
-            db.session.delete(existing_heart)
-        # Add like
-        like = PostLike(post_id=post_id, user_id=current_user.id)
-        db.session.add(like)
+        PostHeart.query.filter_by(post_id=post_id, user_id=current_user.id).delete(synchronize_session=False)
         action = 'liked'
         
         # Create notification for post owner (if not liking own post)
@@ -1013,16 +1370,9 @@ def toggle_post_like(post_id):
             db.session.add(notification)
     
     db.session.commit()
-    # Refresh post to get updated counts
-    db.session.refresh(post)
-    return jsonify({
-        'success': True, 
-        'action': action, 
-        'like_count': len(post.likes),
-        'heart_count': len(post.hearts),
-        'has_like': post.is_liked_by(current_user.id),
-        'has_heart': post.is_hearted_by(current_user.id)
-    })
+    response = {'success': True, 'action': action}
+    response.update(get_post_reaction_state(post_id, current_user.id))
+    return jsonify(response)
 
 
 @app.route('/posts/<int:post_id>/heart', methods=['POST'])
@@ -1031,20 +1381,22 @@ def toggle_post_like(post_id):
 def toggle_post_heart(post_id):
     """Toggle heart on a post - removes like if exists"""
     post = ProfilePost.query.get_or_404(post_id)
-    existing_heart = PostHeart.query.filter_by(post_id=post_id, user_id=current_user.id).first()
-    existing_like = PostLike.query.filter_by(post_id=post_id, user_id=current_user.id).first()
     
-    if existing_heart:
+    # Try to add the heart first; the unique (post_id, user_id) constraint tells us if it already existed
+    try:
+        with db.session.begin_nested():
+            db.session.add(PostHeart(post_id=post_id, user_id=current_user.id))
+        added = True
+    except IntegrityError:
+        added = False
+    
+    if not added:
         # Remove heart
-        db.session.delete(existing_heart)
+        PostHeart.query.filter_by(post_id=post_id, user_id=current_user.id).delete(synchronize_session=False)
         action = 'unhearted'
     else:
         # Remove like if exists (can only have one reaction)
-        if existing_like:
-            db.session.delete(existing_like)
-        # Add heart
-        heart = PostHeart(post_id=post_id, user_id=current_user.id)
-        db.session.add(heart)
+        PostLike.query.filter_by(post_id=post_id, user_id=current_user.id).delete(synchronize_session=False)
         action = 'hearted'
         
         # Create notification for post owner (if not hearting own post)
@@ -1058,16 +1410,9 @@ def toggle_post_heart(post_id):
             db.session.add(notification)
     
     db.session.commit()
-    # Refresh post to get updated counts
-    db.session.refresh(post)
-    return jsonify({
-        'success': True, 
-        'action': action, 
-        'like_count': len(post.likes),
-        'heart_count': len(post.hearts),
-        'has_like': post.is_liked_by(current_user.id),
-        'has_heart': post.is_hearted_by(current_user.id)
-    })
+    response = {'success': True, 'action': action}
+    response.update(get_post_reaction_state(post_id, current_user.id))
+    return jsonify(response)
 
 
 @app.route('/posts/<int:post_id>/share', methods=['POST'])
@@ -1130,18 +1475,13 @@ def share_post(post_id):
         db.session.add(notification)
     
     try:
+        # Read ids before the commit expires the objects, so the redirect needs no reload
+        sharer_musician_id = musician.id
         db.session.commit()
-        # Verify the post was created and refresh to get the ID
-        db.session.refresh(shared_post)
-        
-        if shared_post.id and shared_post.musician_id == musician.id:
-            flash('Post shared to your wall!', 'success')
-            # Redirect to the sharer's own profile to see the shared post
-            # Add a timestamp to force refresh
-            return redirect(url_for('view_musician_profile', id=musician.id) + '?shared=1')
-        else:
-            flash('Error: Post was not created correctly. Please try again.', 'danger')
-            return redirect(url_for('view_musician_profile', id=original_post.musician_id))
+        flash('Post shared to your wall!', 'success')
+        # Redirect to the sharer's own profile to see the shared post
+        # Add a timestamp to force refresh
+        return redirect(url_for('view_musician_profile', id=sharer_musician_id) + '?shared=1')
     except Exception as e:
         db.session.rollback()
         flash(f'Error sharing post: {str(e)}', 'danger')
@@ -1221,69 +1561,61 @@ def musician_availability(user_id):
         db.session.add(musician)
         db.session.commit()
     
-    # Get all availability records for this musician (only show approved leaves)
-    availability_records = MusicianAvailability.query.filter_by(
-        musician_id=musician.id
-    ).all()
-    
-    # Also check for approved leave requests and add them to availability
-    approved_leaves = LeaveRequest.query.filter_by(
-        musician_id=musician.id,
-        status='approved'
-    ).all()
+    # Fetch availability records and leave requests in a single round-trip
+    # Pending leave requests are only shown when the user is viewing their own availability
+    # (rejected leaves never show in the calendar - they can be viewed in the leave requests page)
+    from sqlalchemy import select, literal, null, union_all  # type: ignore
+    leave_statuses = ['approved', 'pending'] if user.id == current_user.id else ['approved']
+    availability_stmt = union_all(
+        select(
+            MusicianAvailability.date,
+            MusicianAvailability.is_available,
+            MusicianAvailability.notes,
+            literal('available').label('source'),
+            null().label('leave_request_id')
+        ).where(MusicianAvailability.musician_id == musician.id),
+        select(
+            LeaveRequest.date,
+            literal(False),
+            LeaveRequest.reason,
+            LeaveRequest.status,
+            LeaveRequest.id
+        ).where(LeaveRequest.musician_id == musician.id, LeaveRequest.status.in_(leave_statuses))
+    )
+    # Apply in precedence order: availability records, then approved leaves, then pending leaves
+    source_order = {'available': 0, 'approved': 1, 'pending': 2}
+    availability_rows = sorted(db.session.execute(availability_stmt).all(), key=lambda row: source_order[row.source])
     
     # Convert to dictionary for easy lookup
     availability_dict = {}
-    
-    # Add availability records
-    for record in availability_records:
-        availability_dict[record.date.isoformat()] = {
-            'is_available': record.is_available,
-            'notes': record.notes
-        }
-    
-    # Add approved leave requests (these override availability records)
-    for leave in approved_leaves:
-        availability_dict[leave.date.isoformat()] = {
-            'is_available': False,
-            'notes': leave.reason,
-            'is_pending': False,  # Explicitly mark as not pending
-            'is_approved': True  # Mark as approved leave
-        }
-    
-    # Check for pending leave requests - show them if user is viewing their own availability
-    # Only add if there's no approved leave for that date
     pending_leaves = []
-    if user.id == current_user.id:
-        pending_leaves = LeaveRequest.query.filter_by(
-            musician_id=musician.id,
-            status='pending'
-        ).all()
-        # Add pending leaves to availability dict with special marker
-        # Only if there's no approved leave for that date (approved takes precedence)
-        for leave in pending_leaves:
-            date_key = leave.date.isoformat()
-            # Only add if this date doesn't exist or if existing entry is not an approved leave
-            # Approved leaves have is_pending=False (or not set)
-            existing = availability_dict.get(date_key, {})
+    for row in availability_rows:
+        date_key = row.date.isoformat()
+        if row.source == 'available':
+            availability_dict[date_key] = {
+                'is_available': row.is_available,
+                'notes': row.notes
+            }
+        elif row.source == 'approved':
+            # Approved leave requests override availability records
+            availability_dict[date_key] = {
+                'is_available': False,
+                'notes': row.notes,
+                'is_pending': False,  # Explicitly mark as not pending
+                'is_approved': True  # Mark as approved leave
+            }
+        else:
+            pending_leaves.append(row)
             # Don't overwrite if there's already an approved leave (is_pending=False)
+            existing = availability_dict.get(date_key, {})
             if date_key not in availability_dict or existing.get('is_pending') != False:
                 availability_dict[date_key] = {
                     'is_available': False,
-                    'notes': leave.reason,
+                    'notes': row.notes,
                     'is_pending': True,
-                    'leave_request_id': leave.id
+                    'leave_request_id': row.leave_request_id
                 }
     
-    # Also check for rejected leave requests to show them (but not as unavailable)
-    rejected_leaves = LeaveRequest.query.filter_by(
-        musician_id=musician.id,
-        status='rejected'
-    ).all()
-    
-    # Note: Rejected leaves are not added to availability_dict, so they won't show in calendar
-    # They can be viewed in the leave requests page
-    
     # Check if user is viewing their own availability
     is_own_availability = (user.id == current_user.id)
     
@@ -1308,18 +1640,16 @@ def toggle_availability(user_id):
             return jsonify({'success': False, 'message': 'You can only file a leave for yourself.'}), 403
         
         # Get or create team member profile for this user
+        # A new profile is inserted with the leave/availability rows in the same commit,
+        # and can't have existing rows yet, so no flush is needed to look them up
         musician = user.musician
-        if not musician:
+        is_new_musician = musician is None
+        if is_new_musician:
             musician = Musician(
                 name=user.get_display_name(),
                 user_id=user.id
             )
             db.session.add(musician)
-            db.session.flush()  # Flush to get ID without committing
-        
-        musician_id = musician.id
-        if not musician_id:
-            return jsonify({'success': False, 'message': 'Failed to create team member profile.'}), 500
         
         data = request.get_json()
         if not data:
@@ -1327,11 +1657,8 @@ def toggle_availability(user_id):
         
         date_str = data.get('date')
         is_available = data.get('is_available', True)
-        reason = data.get('reason', '') or data.get('notes', '')
-        
-        # Strip whitespace and validate
-        if reason:
-            reason = reason.strip()
+        # Strip whitespace once and validate
+        reason = (data.get('reason') or data.get('notes') or '').strip()
         
         if not date_str:
             return jsonify({'success': False, 'message': 'Date is required'}), 400
@@ -1340,91 +1667,81 @@ def toggle_availability(user_id):
             return jsonify({'success': False, 'message': 'Reason is required for leave requests.'}), 400
         
         try:
-            from datetime import datetime
             date_obj = datetime.strptime(date_str, '%Y-%m-%d').date()
         except ValueError:
             return jsonify({'success': False, 'message': 'Invalid date format'}), 400
         
         # If setting as available, directly update availability
         if is_available:
-            availability = MusicianAvailability.query.filter_by(
-                musician_id=musician_id,
-                date=date_obj
-            ).first()
-            
-            if availability:
-                availability.is_available = True
-                availability.notes = ''
-            else:
-                availability = MusicianAvailability(
-                    musician_id=musician_id,
+            if is_new_musician:
+                db.session.add(MusicianAvailability(
+                    musician=musician,
                     date=date_obj,
                     is_available=True,
                     notes=''
-                )
-                db.session.add(availability)
+                ))
+            else:
+                upsert_availability(musician.id, date_obj, True, '')
             db.session.commit()
             return jsonify({'success': True, 'message': 'Availability updated'})
         
         # For leave requests (unavailable), create a leave request
-        # Check if leave request already exists for this date (pending or approved)
-        existing_request = LeaveRequest.query.filter_by(
-            user_id=user_id,
-            musician_id=musician_id,
-            date=date_obj
-        ).filter(LeaveRequest.status.in_(['pending', 'approved'])).first()
-        
-        if existing_request:
-            return jsonify({'success': False, 'message': 'You already have a leave request for this date.'}), 400
-        
-        # Ensure reason is not empty
-        if not reason or not reason.strip():
-            return jsonify({'success': False, 'message': 'A reason is required for leave requests.'}), 400
-        
         # Check if user is a team leader - auto-approve if so
-        is_team_leader = current_user.is_team_leader()
+        is_team_leader = current_user_is_team_leader()
         
         # Create leave request with appropriate status
         leave_request = LeaveRequest(
             user_id=user_id,
-            musician_id=musician_id,
+            musician=musician,
             date=date_obj,
-            reason=reason.strip(),
+            reason=reason,
             status='approved' if is_team_leader else 'pending'
         )
         
         # If team leader, auto-approve by setting reviewed fields
         if is_team_leader:
             leave_request.reviewed_by = current_user.id
-            leave_request.reviewed_at = datetime.utcnow()
+            leave_request.reviewed_at = func.now()
+        
+        # Without the partial unique index (not yet created, or blocked by existing
+        # duplicates) the duplicate check has to be an explicit SELECT
+        if not is_new_musician and not app.config.get('LEAVE_REQUEST_UNIQUE_INDEX'):
+            existing_request = db.session.query(LeaveRequest.id).filter(
+                LeaveRequest.musician_id == musician.id,
+                LeaveRequest.date == date_obj,
+                LeaveRequest.status.in_(['pending', 'approved'])
+            ).first()
+            if existing_request:
+                return jsonify({'success': False, 'message': 'You already have a leave request for this date.'}), 400
         
-        db.session.add(leave_request)
+        # Insert inside a SAVEPOINT - the partial unique index rejects a second
+        # pending/approved request for the same date without a separate SELECT
+        try:
+            with db.session.begin_nested():
+                db.session.add(leave_request)
+        except IntegrityError:
+            return jsonify({'success': False, 'message': 'You already have a leave request for this date.'}), 400
+        # The savepoint flush already returned the new id; reading it after commit would re-SELECT the row
+        leave_request_id = leave_request.id
         
         # If auto-approved (team leader), create availability record immediately
         if is_team_leader:
-            availability = MusicianAvailability.query.filter_by(
-                musician_id=musician_id,
-                date=date_obj
-            ).first()
-            
-            if availability:
-                availability.is_available = False
-                availability.notes = reason.strip()
-            else:
-                availability = MusicianAvailability(
-                    musician_id=musician_id,
+            if is_new_musician:
+                db.session.add(MusicianAvailability(
+                    musician=musician,
                     date=date_obj,
                     is_available=False,
-                    notes=reason.strip()
-                )
-                db.session.add(availability)
+                    notes=reason
+                ))
+            else:
+                upsert_availability(musician.id, date_obj, False, reason)
         
         # Commit leave request and availability (if team leader)
         try:
             db.session.commit()
         except Exception as commit_error:
             db.session.rollback()
-            error_str = str(commit_error).lower()
+            error_str = db_error_message(commit_error)
             if 'leave_request' in error_str or 'no such table' in error_str:
                 return jsonify({
                     'success': False, 
@@ -1438,57 +1755,53 @@ def toggle_availability(user_id):
                 activity_type='leave_approved',
                 actor_id=current_user.id,
                 target_user_id=user_id,
-                description=f"{current_user.get_display_name()} filed and auto-approved a leave request for {date_obj.strftime('%B %d, %Y')}: {reason.strip()}",
-                leave_request_id=leave_request.id,
-                metadata={'date': date_obj.isoformat(), 'reason': reason.strip()}
+                description=f"{current_user.get_display_name()} filed and auto-approved a leave request for {date_obj.strftime('%B %d, %Y')}: {reason}",
+                leave_request_id=leave_request_id,
+                metadata={'date': date_obj.isoformat(), 'reason': reason}
             )
         else:
             log_activity(
                 activity_type='leave_filed',
                 actor_id=current_user.id,
                 target_user_id=user_id,
-                description=f"{current_user.get_display_name()} filed a leave request for {date_obj.strftime('%B %d, %Y')}: {reason.strip()}",
-                leave_request_id=leave_request.id,
-                metadata={'date': date_obj.isoformat(), 'reason': reason.strip()}
+                description=f"{current_user.get_display_name()} filed a leave request for {date_obj.strftime('%B %d, %Y')}: {reason}",
+                leave_request_id=leave_request_id,
+                metadata={'date': date_obj.isoformat(), 'reason': reason}
             )
         
         # Only send notifications to other team leaders if not auto-approved
         if not is_team_leader:
-            team_leaders = User.query.filter(User.role.in_(['team_leader', 'admin'])).all()
-            for team_leader in team_leaders:
-                notification = Notification(
-                    user_id=team_leader.id,
-                    notification_type='leave_request',
-                    actor_id=user_id,
-                    is_read=False
-                )
-                # Set leave_request_id if the attribute exists (column may not exist in old databases)
-                if hasattr(Notification, 'leave_request_id'):
-                    try:
-                        notification.leave_request_id = leave_request.id
-                    except Exception:
-                        # Column doesn't exist yet - continue without it
-                        pass
-                db.session.add(notification)
+            # Only the ids are needed - skip hydrating full User objects
+            team_leader_ids = [uid for (uid,) in db.session.query(User.id).filter(User.role.in_(['team_leader', 'admin'])).all()]
+            notification_rows = [{
+                'user_id': team_leader_id,
+                'notification_type': 'leave_request',
+                'actor_id': user_id,
+                'is_read': False
+            } for team_leader_id in team_leader_ids]
+            # Set leave_request_id if the attribute exists (column may not exist in old databases)
+            if NOTIFICATION_HAS_LEAVE_REQUEST_ID:
+                for row in notification_rows:
+                    row['leave_request_id'] = leave_request_id
             
             try:
+                # One multi-row INSERT instead of an ORM object per team leader
+                if notification_rows:
+                    db.session.execute(Notification.__table__.insert(), notification_rows)
+                    mark_notification_recipients(team_leader_ids)
                 db.session.commit()
             except Exception as commit_error:
                 # If notification commit fails due to missing column, still return success
                 # The leave request was already created
-                error_str = str(commit_error).lower()
+                error_str = db_error_message(commit_error)
                 if 'leave_request_id' in error_str or 'no such column' in error_str:
                     print(f"Warning: Could not set leave_request_id on notifications: {commit_error}")
                     db.session.rollback()
                     # Re-commit without leave_request_id
-                    for team_leader in team_leaders:
-                        notification = Notification(
-                            user_id=team_leader.id,
-                            notification_type='leave_request',
-                            actor_id=user_id,
-                            is_read=False
-                        )
-                        db.session.add(notification)
+                    for row in notification_rows:
+                        row.pop('leave_request_id', None)
+                    db.session.execute(Notification.__table__.insert(), notification_rows)
+                    mark_notification_recipients(team_leader_ids)
                     db.session.commit()
                 else:
                     raise
@@ -1513,11 +1826,11 @@ def toggle_availability(user_id):
         print(error_traceback)
         
         # Provide more helpful error messages
-        error_message = str(e)
-        if 'no such column' in error_message.lower() or 'leave_request_id' in error_message.lower():
-            error_message = 'Database migration required. Please restart the application to run migrations.'
-        elif 'no such table' in error_message.lower() or 'leave_request' in error_message.lower():
+        db_message = db_error_message(e)
+        if any(marker in db_message for marker in ('no such column', 'no such table', 'leave_request')):
             error_message = 'Database migration required. Please restart the application to run migrations.'
+        else:
+            error_message = str(e)
         
         return jsonify({'success': False, 'message': f'An error occurred: {error_message}'}), 500
 
@@ -1546,12 +1859,21 @@ def remove_availability(user_id):
         return jsonify({'success': False, 'message': 'Date is required'}), 400
     
     try:
-        from datetime import datetime
         date_obj = datetime.strptime(date_str, '%Y-%m-%d').date()
     except ValueError:
         return jsonify({'success': False, 'message': 'Invalid date format'}), 400
     
-    # First check if it's an approved leave request
+    # Delete the availability record up front; RETURNING tells whether one existed
+    from sqlalchemy import delete  # type: ignore
+    deleted = db.session.execute(
+        delete(MusicianAvailability).where(
+            MusicianAvailability.musician_id == musician_id,
+            MusicianAvailability.date == date_obj
+        ).returning(MusicianAvailability.id)
+    ).first()
+    
+    # Always look for an approved leave: marking the date available afterwards
+    # overwrites the unavailable record but leaves the approved request in place
     leave_request = LeaveRequest.query.filter_by(
         musician_id=musician_id,
         date=date_obj,
@@ -1562,19 +1884,12 @@ def remove_availability(user_id):
         # Cancel the approved leave request
         # Only the user who requested it can cancel it
         if leave_request.user_id != current_user.id:
+            db.session.rollback()
             return jsonify({'success': False, 'message': 'You can only cancel your own leave requests.'}), 403
         
         # Update leave request status to cancelled
         leave_request.status = 'cancelled'
-        leave_request.reviewed_at = datetime.utcnow()
-        
-        # Delete the associated availability record
-        availability = MusicianAvailability.query.filter_by(
-            musician_id=musician_id,
-            date=date_obj
-        ).first()
-        if availability:
-            db.session.delete(availability)
+        leave_request.reviewed_at = func.now()
         
         # Notify the approver (if there was one) that the leave was cancelled
         if leave_request.reviewed_by:
@@ -1585,11 +1900,8 @@ def remove_availability(user_id):
                 is_read=False
             )
             # Set leave_request_id if the attribute exists
-            if hasattr(Notification, 'leave_request_id'):
-                try:
-                    notification.leave_request_id = leave_request.id
-                except Exception:
-                    pass
+            if NOTIFICATION_HAS_LEAVE_REQUEST_ID:
+                notification.leave_request_id = leave_request.id
             db.session.add(notification)
         
         # Log activity
@@ -1609,14 +1921,7 @@ def remove_availability(user_id):
             db.session.rollback()
             return jsonify({'success': False, 'message': f'Error cancelling leave request: {str(e)}'}), 500
     
-    # Delete the availability record
-    availability = MusicianAvailability.query.filter_by(
-        musician_id=musician_id,
-        date=date_obj
-    ).first()
-    
-    if availability:
-        db.session.delete(availability)
+    if deleted:
         db.session.commit()
         return jsonify({'success': True, 'message': 'Availability removed'})
     else:
@@ -1629,14 +1934,29 @@ def remove_availability(user_id):
 @login_required
 def leave_requests():
     """View leave requests - Team Leaders see all pending, users see their own"""
+    from sqlalchemy.orm import joinedload, load_only  # type: ignore
+    page = request.args.get('page', 1, type=int)
+    # Only the columns the template shows, with requester and reviewer loaded in the same query
+    query = LeaveRequest.query.options(
+        load_only(
+            LeaveRequest.id, LeaveRequest.user_id, LeaveRequest.date, LeaveRequest.reason, LeaveRequest.status,
+            LeaveRequest.requested_at, LeaveRequest.reviewed_by, LeaveRequest.reviewed_at
+        ),
+        joinedload(LeaveRequest.user),
+        joinedload(LeaveRequest.reviewer)
+    )
     if current_user.is_team_leader():
         # Team Leaders see all pending requests
-        pending_requests = LeaveRequest.query.filter_by(status='pending').order_by(LeaveRequest.date.asc()).all()
-        return render_template('leave_requests.html', requests=pending_requests, is_team_leader=True)
+        pagination = query.filter_by(status='pending').order_by(LeaveRequest.date.asc()).paginate(
+            page=page, per_page=LEAVE_REQUESTS_PER_PAGE, error_out=False
+        )
+        return render_template('leave_requests.html', requests=pagination.items, pagination=pagination, is_team_leader=True)
     else:
         # Regular users see their own requests
-        user_requests = LeaveRequest.query.filter_by(user_id=current_user.id).order_by(LeaveRequest.date.desc()).all()
-        return render_template('leave_requests.html', requests=user_requests, is_team_leader=False)
+        pagination = query.filter_by(user_id=current_user.id).order_by(LeaveRequest.date.desc()).paginate(
+            page=page, per_page=LEAVE_REQUESTS_PER_PAGE, error_out=False
+        )
+        return render_template('leave_requests.html', requests=pagination.items, pagination=pagination, is_team_leader=False)
 
 
 @app.route('/leave-requests/<int:request_id>/approve', methods=['POST'])
@@ -1655,25 +1975,10 @@ def approve_leave_request(request_id):
     # Update leave request status
     leave_request.status = 'approved'
     leave_request.reviewed_by = current_user.id
-    leave_request.reviewed_at = datetime.utcnow()
+    leave_request.reviewed_at = func.now()
     
     # Create or update availability record
-    availability = MusicianAvailability.query.filter_by(
-        musician_id=leave_request.musician_id,
-        date=leave_request.date
-    ).first()
-    
-    if availability:
-        availability.is_available = False
-        availability.notes = leave_request.reason
-    else:
-        availability = MusicianAvailability(
-            musician_id=leave_request.musician_id,
-            date=leave_request.date,
-            is_available=False,
-            notes=leave_request.reason
-        )
-        db.session.add(availability)
+    upsert_availability(leave_request.musician_id, leave_request.date, False, leave_request.reason)
     
     # Notify the user that their leave was approved
     notification = Notification(
@@ -1683,11 +1988,8 @@ def approve_leave_request(request_id):
         is_read=False
     )
     # Set leave_request_id if the attribute exists (column may not exist in old databases)
-    if hasattr(Notification, 'leave_request_id'):
-        try:
-            notification.leave_request_id = leave_request.id
-        except Exception:
-            pass  # Ignore if column doesn't exist
+    if NOTIFICATION_HAS_LEAVE_REQUEST_ID:
+        notification.leave_request_id = leave_request.id
     db.session.add(notification)
     
     # Log activity
@@ -1728,7 +2030,7 @@ def reject_leave_request(request_id):
     # Update leave request status
     leave_request.status = 'rejected'
     leave_request.reviewed_by = current_user.id
-    leave_request.reviewed_at = datetime.utcnow()
+    leave_request.reviewed_at = func.now()
     leave_request.review_notes = review_notes
     
     # Notify the user that their leave was rejected
@@ -1739,11 +2041,8 @@ def reject_leave_request(request_id):
         is_read=False
     )
     # Set leave_request_id if the attribute exists (column may not exist in old databases)
-    if hasattr(Notification, 'leave_request_id'):
-        try:
-            notification.leave_request_id = leave_request.id
-        except Exception:
-            pass  # Ignore if column doesn't exist
+    if NOTIFICATION_HAS_LEAVE_REQUEST_ID:
+        notification.leave_request_id = leave_request.id
     db.session.add(notification)
     
     try:
@@ -1764,70 +2063,97 @@ def approve_all_leave_requests():
         return jsonify({'success': False, 'message': 'Only Team Leaders can approve leave requests.'}), 403
     
     try:
-        # Get all pending leave requests
-        pending_requests = LeaveRequest.query.filter_by(status='pending').all()
+        from sqlalchemy import update, insert, select, exists, literal  # type: ignore
+        from sqlalchemy.orm import joinedload, aliased  # type: ignore
+        
+        # Get all pending leave requests (with the requester, for the activity log)
+        pending_requests = LeaveRequest.query.options(
+            joinedload(LeaveRequest.user)
+        ).filter_by(status='pending').all()
         
         if not pending_requests:
             return jsonify({'success': False, 'message': 'No pending leave requests to approve.'}), 400
         
-        approved_count = 0
-        errors = []
+        request_ids = [leave_request.id for leave_request in pending_requests]
         
-        for leave_request in pending_requests:
-            try:
-                # Update leave request status
-                leave_request.status = 'approved'
-                leave_request.reviewed_by = current_user.id
-                leave_request.reviewed_at = datetime.utcnow()
-                
-                # Create or update availability record
-                availability = MusicianAvailability.query.filter_by(
-                    musician_id=leave_request.musician_id,
-                    date=leave_request.date
-                ).first()
-                
-                if availability:
-                    availability.is_available = False
-                    availability.notes = leave_request.reason
-                else:
-                    availability = MusicianAvailability(
-                        musician_id=leave_request.musician_id,
-                        date=leave_request.date,
-                        is_available=False,
-                        notes=leave_request.reason
+        # Approve every pending request in one UPDATE; the database stamps reviewed_at
+        db.session.execute(
+            update(LeaveRequest).where(LeaveRequest.id.in_(request_ids)).values(
+                status='approved',
+                reviewed_by=current_user.id,
+                reviewed_at=func.now()
+            )
+        )
+        
+        # Mark existing availability records for those dates as unavailable in one UPDATE
+        matching_leave = select(LeaveRequest.reason).where(
+            LeaveRequest.id.in_(request_ids),
+            LeaveRequest.musician_id == MusicianAvailability.musician_id,
+            LeaveRequest.date == MusicianAvailability.date
+        )
+        db.session.execute(
+            update(MusicianAvailability).where(matching_leave.exists()).values(
+                is_available=False,
+                notes=matching_leave.order_by(LeaveRequest.id).limit(1).scalar_subquery()
+            ).execution_options(synchronize_session=False)
+        )
+        
+        # Create the missing availability records with one INSERT ... SELECT
+        # (one row per musician/date, taking the oldest request if there are duplicates)
+        other_leave = aliased(LeaveRequest)
+        first_request_id = select(func.min(other_leave.id)).where(
+            other_leave.id.in_(request_ids),
+            other_leave.musician_id == LeaveRequest.musician_id,
+            other_leave.date == LeaveRequest.date
+        ).scalar_subquery()
+        db.session.execute(
+            insert(MusicianAvailability).from_select(
+                ['musician_id', 'date', 'is_available', 'notes', 'created_at'],
+                select(
+                    LeaveRequest.musician_id, LeaveRequest.date, literal(False), LeaveRequest.reason, func.now()
+                ).where(
+                    LeaveRequest.id.in_(request_ids),
+                    LeaveRequest.id == first_request_id,
+                    ~exists().where(
+                        MusicianAvailability.musician_id == LeaveRequest.musician_id,
+                        MusicianAvailability.date == LeaveRequest.date
                     )
-                    db.session.add(availability)
-                
-                # Notify the user that their leave was approved
-                notification = Notification(
-                    user_id=leave_request.user_id,
-                    notification_type='leave_approved',
-                    actor_id=current_user.id,
-                    is_read=False
                 )
-                # Set leave_request_id if the attribute exists
-                if hasattr(Notification, 'leave_request_id'):
-                    try:
-                        notification.leave_request_id = leave_request.id
-                    except Exception:
-                        pass
-                db.session.add(notification)
-                
-                # Log activity for each approved leave
-                log_activity(
-                    activity_type='leave_approved',
-                    actor_id=current_user.id,
-                    target_user_id=leave_request.user_id,
-                    description=f"{current_user.get_display_name()} approved {leave_request.user.get_display_name()}'s leave request for {leave_request.date.strftime('%B %d, %Y')}: {leave_request.reason}",
-                    leave_request_id=leave_request.id,
-                    metadata={'date': leave_request.date.isoformat(), 'reason': leave_request.reason}
-                )
-                
-                approved_count += 1
-            except Exception as e:
-                errors.append(f"Error approving request {leave_request.id}: {str(e)}")
-                db.session.rollback()
-                continue
+            )
+        )
+        
+        # Notify each user that their leave was approved, in one multi-row INSERT
+        notification_rows = [{
+            'user_id': leave_request.user_id,
+            'notification_type': 'leave_approved',
+            'actor_id': current_user.id,
+            'is_read': False
+        } for leave_request in pending_requests]
+        # Set leave_request_id if the attribute exists
+        if NOTIFICATION_HAS_LEAVE_REQUEST_ID:
+            for row, leave_request in zip(notification_rows, pending_requests):
+                row['leave_request_id'] = leave_request.id
+        db.session.execute(Notification.__table__.insert(), notification_rows)
+        mark_notification_recipients(row['user_id'] for row in notification_rows)
+        
+        # Log activity for each approved leave
+        # Format the approver's name and each distinct date once instead of per request
+        approver_name = current_user.get_display_name()
+        approver_id = current_user.id
+        date_labels = {
+            leave_date: (leave_date.isoformat(), leave_date.strftime('%B %d, %Y'))
+            for leave_date in {leave_request.date for leave_request in pending_requests}
+        }
+        for leave_request in pending_requests:
+            iso_date, display_date = date_labels[leave_request.date]
+            log_activity(
+                activity_type='leave_approved',
+                actor_id=approver_id,
+                target_user_id=leave_request.user_id,
+                description=f"{approver_name} approved {leave_request.user.get_display_name()}'s leave request for {display_date}: {leave_request.reason}",
+                leave_request_id=leave_request.id,
+                metadata={'date': iso_date, 'reason': leave_request.reason}
+            )
         
         # Commit all changes
         try:
@@ -1836,11 +2162,8 @@ def approve_all_leave_requests():
             db.session.rollback()
             return jsonify({'success': False, 'message': f'Error committing changes: {str(e)}'}), 500
         
-        if errors:
-            message = f'Approved {approved_count} leave request(s). Some errors occurred: {"; ".join(errors)}'
-        else:
-            message = f'Successfully approved {approved_count} leave request(s).'
-        
+        approved_count = len(request_ids)
+        message = f'Successfully approved {approved_count} leave request(s).'
         return jsonify({'success': True, 'message': message, 'count': approved_count})
     
     except Exception as e:
@@ -1878,10 +2201,9 @@ def add_service():
 @login_required
 def service_detail(id):
     service = SundayService.query.get_or_404(id)
-    musicians_list = Musician.query.order_by(Musician.name).all()
     form = ServiceMusicianForm()
-    form.musician_id.choices = [(m.id, m.name) for m in musicians_list]
-    return render_template('service_detail.html', service=service, musicians=musicians_list, form=form)
+    form.musician_id.choices = _musician_choices()
+    return render_template('service_detail.html', service=service, form=form)
 
 
 @app.route('/services/<int:id>/edit', methods=['GET', 'POST'])
@@ -1914,7 +2236,7 @@ def delete_service(id):
 def add_service_musician(service_id):
     service = SundayService.query.get_or_404(service_id)
     form = ServiceMusicianForm()
-    form.musician_id.choices = [(m.id, m.name) for m in Musician.query.order_by(Musician.name).all()]
+    form.musician_id.choices = _musician_choices()
     
     if form.validate_on_submit():
         assignment = ServiceMusician(
@@ -1990,16 +2312,22 @@ def add_practice():
         db.session.add(practice)
         db.session.flush()  # Flush to get practice.id
         
-        # Create notifications for all users (except the creator)
-        all_users = User.query.filter(User.id != current_user.id).all()
-        for user in all_users:
-            notification = Notification(
-                user_id=user.id,
-                notification_type='practice',
-                actor_id=current_user.id,
-                practice_id=practice.id
+        # Create notifications for all users (except the creator) with a single INSERT ... SELECT
+        from sqlalchemy import insert, select, literal  # type: ignore
+        db.session.execute(
+            insert(Notification).from_select(
+                ['user_id', 'notification_type', 'actor_id', 'practice_id', 'is_read', 'created_at'],
+                select(
+                    User.id,
+                    literal('practice'),
+                    literal(current_user.id),
+                    literal(practice.id),
+                    literal(False),
+                    literal(datetime.utcnow())
+                ).where(User.id != current_user.id)
             )
-            db.session.add(notification)
+        )
+        mark_notification_recipients()
         
         db.session.commit()
         flash('Practice added successfully.', 'success')
@@ -2012,43 +2340,25 @@ def add_practice():
 def practice_detail(id):
     from sqlalchemy.orm import joinedload  # type: ignore
     from models import PracticeMusician, Musician
-    # Load practice with all relationships
+    # Load practice with its assignments and their musicians in one query
     practice = Practice.query.options(
         joinedload(Practice.musicians).joinedload(PracticeMusician.musician)
     ).get_or_404(id)
     
-    # Ensure all musicians are properly loaded (fallback if joinedload doesn't work)
-    # Query PracticeMusician directly to ensure we get all assignments
-    practice_musicians = PracticeMusician.query.filter_by(practice_id=id).all()
-    # Verify each assignment has its musician loaded
-    for pm in practice_musicians:
-        if pm.musician_id and not hasattr(pm, '_musician_loaded'):
-            if not pm.musician:
-                pm.musician = Musician.query.get(pm.musician_id)
-            pm._musician_loaded = True
-    
-    # Update practice.musicians to use the directly queried list
-    # This ensures we have all assignments with properly loaded musicians
-    practice._musicians_list = practice_musicians
-    musicians_list = Musician.query.order_by(Musician.name).all()
-    songs_list = Song.query.order_by(Song.title).all()
-    users_list = User.query.order_by(User.username).all()  # For "Prepared by" dropdown
+    users_list = User.query.options(joinedload(User.musician)).order_by(User.username).all()  # For "Prepared by" dropdown
     form = PracticeMusicianForm()
     # Show only users from the user list in dropdown
-    # Get or create musician profile for each user
-    musician_choices = []
-    for user in users_list:
-        if not user.musician:
-            # Create musician profile if it doesn't exist
-            musician = Musician(
-                name=user.get_display_name(),
-                user_id=user.id
-            )
-            db.session.add(musician)
-            db.session.commit()
-        else:
-            musician = user.musician
-        musician_choices.append((musician.id, user.get_display_name()))
+    # Create missing musician profiles in one batch instead of committing per user
+    missing_profiles = [
+        Musician(name=user.get_display_name(), user=user)
+        for user in users_list if not user.musician
+    ]
+    if missing_profiles:
+        db.session.add_all(missing_profiles)
+        db.session.flush()  # Single batched INSERT; assigns the ids used for the choices
+    musician_choices = [(user.musician.id, user.get_display_name()) for user in users_list]
+    if missing_profiles:
+        db.session.commit()
     form.musician_id.choices = musician_choices
     
     # Get songs in lineup order
@@ -2056,8 +2366,6 @@ def practice_detail(id):
     
     return render_template('practice_detail.html', 
                          practice=practice, 
-                         musicians=musicians_list, 
-                         songs=songs_list,
                          users=users_list,
                          practice_songs=practice_songs,
                          form=form)
@@ -2131,11 +2439,15 @@ def delete_practice(id):
 def delete_all_practices():
     """Delete all scheduled practices - Admin only"""
     try:
-        # Get count before deletion
-        practice_count = Practice.query.count()
-        
-        # Delete all practices (cascade will handle related records)
-        Practice.query.delete()
+        from sqlalchemy import delete, update  # type: ignore
+        
+        # Bulk deletes skip the ORM cascade, so clear the child rows with one statement
+        # per table first (SMS logs are kept as history, just unlinked)
+        db.session.execute(delete(PracticeMusician))
+        db.session.execute(delete(PracticeSong))
+        db.session.execute(delete(Notification).where(Notification.practice_id.isnot(None)))
+        db.session.execute(update(SMSLog).where(SMSLog.practice_id.isnot(None)).values(practice_id=None))
+        practice_count = db.session.execute(delete(Practice)).rowcount
         db.session.commit()
         
         flash(f'Successfully deleted {practice_count} practice(s).', 'success')
@@ -2153,26 +2465,27 @@ def add_practice_musician(practice_id):
     form = PracticeMusicianForm()
     # Show only users from the user list in dropdown
     # Get or create musician profile for each user
-    users_list = User.query.order_by(User.username).all()
-    musician_choices = []
+    # Profile changes are committed together with the assignment (or on their own if the form is invalid)
+    from sqlalchemy.orm import joinedload  # type: ignore
+    users_list = User.query.options(joinedload(User.musician)).order_by(User.username).all()
+    profiles_changed = False
+    created_profiles = False
     for user in users_list:
         if not user.musician:
             # Create musician profile if it doesn't exist, syncing role
-            musician = Musician(
+            db.session.add(Musician(
                 name=user.get_display_name(),
-                user_id=user.id,
+                user=user,
                 instruments=user.role if user.role in ['case_manager', 'shipment_coordinator', 'data_analyst', 'team_leader'] else None
-            )
-            db.session.add(musician)
-            db.session.commit()
-        else:
-            musician = user.musician
+            ))
+            profiles_changed = created_profiles = True
+        elif not user.musician.instruments and user.role in ['case_manager', 'shipment_coordinator', 'data_analyst', 'team_leader']:
             # Sync role if musician profile exists but doesn't have a role set
-            if not musician.instruments and user.role in ['case_manager', 'shipment_coordinator', 'data_analyst', 'team_leader']:
-                musician.instruments = user.role
-                db.session.commit()
-        musician_choices.append((musician.id, user.get_display_name()))
-    form.musician_id.choices = musician_choices
+            user.musician.instruments = user.role
+            profiles_changed = True
+    if created_profiles:
+        db.session.flush()  # Single batched INSERT; assigns the ids used for the choices
+    form.musician_id.choices = [(user.musician.id, user.get_display_name()) for user in users_list]
     
     if form.validate_on_submit():
         assignment = PracticeMusician(
@@ -2181,86 +2494,29 @@ def add_practice_musician(practice_id):
             instrument=form.instrument.data
         )
         db.session.add(assignment)
-        db.session.flush()  # Flush to get assignment ID
         
         # Get the musician object
         musician = Musician.query.get(form.musician_id.data)
+        db.session.commit()
         
-        # Send SMS notification
-        sms_sent = False
-        sms_error = None
         if musician:
+            # Send the SMS notification in the background; the task logs the attempt to SMSLog,
+            # notifies the current user of the result and schedules the day-before and hour-before reminders
+            from app.tasks.sms import queue_practice_assignment_sms  # type: ignore
             try:
-                result = send_practice_assignment_sms(practice, musician, is_new_assignment=True)
-                # Handle old (success, error), new (success, error, sid), and latest (success, error, sid, status) formats
-                if len(result) == 4:
-                    success, error, message_sid, _ = result
-                elif len(result) == 3:
-                    success, error, message_sid = result
-                else:
-                    success, error = result[0], result[1] if len(result) > 1 else None
-                    message_sid = None
-                
-                # Get user info for logging
-                user = musician.user if musician.user_id else None
-                recipient_name = user.get_display_name() if user else musician.get_display_name()
-                recipient_phone = format_phone_number(user.mobile_number) if user and user.mobile_number else None
-                
-                # Log SMS attempt
-                try:
-                    sms_log = SMSLog(
-                        recipient_user_id=user.id if user else None,
-                        recipient_phone=recipient_phone or 'Unknown',
-                        recipient_name=recipient_name,
-                        message_type='practice_assignment',
-                        practice_id=practice.id,
-                        musician_id=musician.id,
-                        message_content=f"Practice assignment notification for {practice.date.strftime('%B %d, %Y') if practice.date else 'TBD'}",
-                        status='success' if success else 'failed',
-                        error_message=error if not success else None,
-                        sent_by_user_id=current_user.id
-                    )
-                    db.session.add(sms_log)
-                except Exception as log_error:
-                    print(f"Warning: Could not log SMS: {log_error}")
-                
-                if success:
-                    sms_sent = True
-                    # Schedule SMS reminders (1 day before and 1 hour before)
-                    if practice.date and practice.time:
-                        try:
-                            schedule_practice_sms_reminders(practice, musician)
-                        except Exception as e:
-                            print(f"Warning: Could not schedule SMS reminders: {e}")
-                    
-                    # Commit before redirecting
-                    db.session.commit()
-                    
-                    # For admins/worship leaders, redirect to success page
-                    if current_user.is_admin() or current_user.is_worship_leader():
-                        return redirect(url_for('sms_success', practice_id=practice_id, musician_id=musician.id))
-                else:
-                    sms_error = error
-                    flash(f'Team member added to practice. SMS notification failed: {error}', 'warning')
+                queue_practice_assignment_sms(practice_id, form.musician_id.data, current_user.id)
             except Exception as e:
-                sms_error = str(e)
                 flash(f'Team member added to practice. SMS notification error: {str(e)}', 'warning')
-        
-        db.session.commit()
-        
-        # Schedule SMS reminders (1 day before and 1 hour before) - fallback if SMS failed
-        if musician and practice.date and practice.time and not sms_sent:
-            try:
-                schedule_practice_sms_reminders(practice, musician)
-            except Exception as e:
-                print(f"Warning: Could not schedule SMS reminders: {e}")
-        
-        # Expire the practice object's musicians relationship so it reloads on next access
-        db.session.expire(practice, ['musicians'])
-        
-        if not musician or not any('SMS' in str(m) for m in getattr(flash, '_messages', [])):
+                return redirect(url_for('practice_detail', id=practice_id))
+            # Admins and worship leaders land on the SMS status for this assignment
+            if current_user.is_admin() or current_user.is_worship_leader():
+                return redirect(url_for('sms_status', practice_id=practice_id, musician_id=form.musician_id.data))
+            flash('Team member added to practice. SMS notification is being sent.', 'success')
+        else:
             flash('Team member added to practice.', 'success')
     else:
+        if profiles_changed:
+            db.session.commit()
         if form.errors:
             flash(f'Error adding team member: {form.errors}', 'danger')
         else:
@@ -2293,6 +2549,34 @@ def sms_success():
                          user=user)
 
 
+@app.route('/sms-status')
+@login_required
+def sms_status():
+    """Show the result of the latest practice assignment SMS the current user sent for a practice"""
+    if not (current_user.is_admin() or current_user.is_worship_leader()):
+        flash('Access denied.', 'danger')
+        return redirect(url_for('dashboard'))
+    
+    practice_id = request.args.get('practice_id', type=int)
+    musician_id = request.args.get('musician_id', type=int)
+    if not practice_id:
+        flash('Invalid request.', 'danger')
+        return redirect(url_for('practices'))
+    
+    query = SMSLog.query.filter_by(practice_id=practice_id, message_type='practice_assignment', sent_by_user_id=current_user.id)
+    if musician_id:
+        query = query.filter_by(musician_id=musician_id)
+    sms_log = query.order_by(SMSLog.created_at.desc(), SMSLog.id.desc()).first()
+    
+    if sms_log is None:
+        flash('Team member added to practice. The SMS notification is being sent; you will get a notification with the result.', 'info')
+    elif sms_log.status == 'success':
+        return redirect(url_for('sms_success', practice_id=practice_id, musician_id=sms_log.musician_id))
+    else:
+        flash(f'SMS notification to {sms_log.recipient_name or "team member"} failed: {sms_log.error_message or "Unknown error"}', 'warning')
+    return redirect(url_for('practice_detail', id=practice_id))
+
+
 @app.route('/practices/<int:practice_id>/musicians/<int:assignment_id>/delete', methods=['POST'])
 @worship_leader_required
 def delete_practice_musician(practice_id, assignment_id):
@@ -2330,10 +2614,13 @@ def add_practice_songs(practice_id):
         flash('Please enter at least one song name.', 'warning')
         return redirect(url_for('practice_detail', id=practice_id))
     
-    # Get current max order
-    max_order = db.session.query(db.func.max(PracticeSong.order)).filter_by(practice_id=practice_id).scalar() or 0
+    # Current lineup in one query: the max order and the names already in it.
+    # New names are added as they're queued so duplicates within the same submission are caught too
+    lineup_rows = db.session.query(PracticeSong.order, PracticeSong.song_name).filter_by(practice_id=practice_id).all()
+    max_order = max((order for order, _ in lineup_rows if order is not None), default=0)
+    lineup_names = {name.lower() for _, name in lineup_rows if name}
     
-    added_count = 0
+    new_rows = []
     skipped_count = 0
     
     for i, song_name in enumerate(song_names):
@@ -2347,27 +2634,27 @@ def add_practice_songs(practice_id):
         order = int(orders[i]) if i < len(orders) and orders[i] else (max_order + i + 1)
         
         # Check if song already in lineup (case-insensitive)
-        existing = PracticeSong.query.filter_by(practice_id=practice_id).filter(
-            db.func.lower(PracticeSong.song_name) == song_name.lower()
-        ).first()
-        
-        if existing:
+        if song_name.lower() in lineup_names:
             skipped_count += 1
             continue
         
-        practice_song = PracticeSong(
-            practice_id=practice_id,
-            song_id=None,  # Custom songs only
-            song_name=song_name,
-            key=key if key else None,
-            speed=speed if speed else None,
-            prepared_by=prepared_by if prepared_by else None,
-            order=order
-        )
-        db.session.add(practice_song)
-        added_count += 1
+        lineup_names.add(song_name.lower())
+        new_rows.append({
+            'practice_id': practice_id,
+            'song_id': None,  # Custom songs only
+            'song_name': song_name,
+            'key': key if key else None,
+            'speed': speed if speed else None,
+            'prepared_by': prepared_by if prepared_by else None,
+            'order': order
+        })
     
-    db.session.commit()
+    # One multi-row INSERT for the whole lineup instead of a flush per song
+    if new_rows:
+        from sqlalchemy import insert  # type: ignore
+        db.session.execute(insert(PracticeSong), new_rows)
+        db.session.commit()
+    added_count = len(new_rows)
     
     if added_count > 0:
         flash(f'{added_count} song(s) added to lineup.', 'success')
@@ -2403,12 +2690,15 @@ def allowed_file(filename):
 @login_required
 def slides():
     from sqlalchemy import func  # type: ignore
+    from sqlalchemy.orm import load_only  # type: ignore
+    # The list only shows these columns; skip description and the rest
+    list_columns = load_only(Slide.id, Slide.title, Slide.artist, Slide.file_type, Slide.file_path)
     search_query = request.args.get('search', '').strip()
     selected_artist = request.args.get('artist', '').strip()
     
     try:
         # Start with base query
-        query = Slide.query
+        query = Slide.query.options(list_columns)
         
         # Apply title search filter
         if search_query:
@@ -2426,7 +2716,7 @@ def slides():
         # If error due to missing column, run migration and retry
         if 'gender_key' in str(e):
             migrate_database()
-            query = Slide.query
+            query = Slide.query.options(list_columns)
             
             if search_query:
                 search_filter = f'%{search_query.lower()}%'
@@ -2452,36 +2742,29 @@ def allowed_slide_file(filename):
            filename.rsplit('.', 1)[1].lower() in app.config['ALLOWED_SLIDE_EXTENSIONS']
 
 
-def detect_file_type_from_extension(filename):
-    """Detect file type from file extension"""
-    if not filename:
-        return None
-    
-    ext = filename.rsplit('.', 1)[1].lower() if '.' in filename else ''
-    
+FILE_TYPE_BY_EXTENSION = {
     # Word documents
-    if ext in ['doc', 'docx']:
-        return 'word'
+    'doc': 'word', 'docx': 'word',
     # Excel/Spreadsheets
-    elif ext in ['xls', 'xlsx']:
-        return 'excel'
+    'xls': 'excel', 'xlsx': 'excel',
     # CSV files
-    elif ext == 'csv':
-        return 'csv'
+    'csv': 'csv',
     # Images
-    elif ext in ['jpg', 'jpeg', 'png', 'gif']:
-        return 'image'
+    'jpg': 'image', 'jpeg': 'image', 'png': 'image', 'gif': 'image',
     # PDF
-    elif ext == 'pdf':
-        return 'pdf'
+    'pdf': 'pdf',
     # Text files
-    elif ext == 'txt':
-        return 'txt'
+    'txt': 'txt',
     # PowerPoint
-    elif ext in ['ppt', 'pptx']:
-        return 'powerpoint'
-    else:
+    'ppt': 'powerpoint', 'pptx': 'powerpoint',
+}
+
+
+def detect_file_type_from_extension(filename):
+    """Detect file type from file extension"""
+    if not filename or '.' not in filename:
         return None
+    return FILE_TYPE_BY_EXTENSION.get(filename.rpartition('.')[2].lower())
 
 
 @app.route('/slides/add', methods=['GET', 'POST'])
@@ -2489,8 +2772,7 @@ def detect_file_type_from_extension(filename):
 def add_slide():
     form = SlideForm()
     # Populate contributor dropdown with users
-    users = User.query.order_by(User.username).all()
-    form.artist.choices = [('', 'Select Contributor...')] + [(user.get_display_name(), user.get_display_name()) for user in users]
+    form.artist.choices = [('', 'Select Contributor...')] + [(name, name) for name in _user_display_names()]
     if form.validate_on_submit():
         file_path = None
         
@@ -2508,7 +2790,7 @@ def add_slide():
                 slides_dir = app.config['SLIDES_FOLDER']
                 os.makedirs(slides_dir, exist_ok=True)
                 file_path_full = os.path.join(slides_dir, filename)
-                file.save(file_path_full)
+                save_upload(file, file_path_full)
                 file_path = filename
                 flash(f'File uploaded: {filename}', 'info')
             else:
@@ -2559,8 +2841,7 @@ def edit_slide(id):
     slide = Slide.query.get_or_404(id)
     form = SlideForm(obj=slide)
     # Populate contributor dropdown with users
-    users = User.query.order_by(User.username).all()
-    user_display_names = [user.get_display_name() for user in users]
+    user_display_names = _user_display_names()
     form.artist.choices = [('', 'Select Contributor...')] + [(name, name) for name in user_display_names]
     # If existing artist value doesn't match any user, add it as an option
     if slide.artist and slide.artist not in user_display_names:
@@ -2588,17 +2869,15 @@ def edit_slide(id):
                 # Delete old file if it exists
                 if slide.file_path:
                     old_file_path = os.path.join(app.config['SLIDES_FOLDER'], slide.file_path)
-                    if os.path.exists(old_file_path):
-                        try:
-                            os.remove(old_file_path)
-                        except:
-                            pass
+                    safe_unlink(old_file_path, 'old slide file')
+                    for cache_path in slide_text_cache_files(old_file_path):
+                        safe_unlink(cache_path, 'slide text cache')
                 
                 # Save new file
                 slides_dir = app.config['SLIDES_FOLDER']
                 os.makedirs(slides_dir, exist_ok=True)
                 file_path_full = os.path.join(slides_dir, filename)
-                file.save(file_path_full)
+                save_upload(file, file_path_full)
                 file_path = filename
                 flash(f'File uploaded: {filename}', 'info')
             else:
@@ -2646,79 +2925,84 @@ def edit_slide(id):
 @admin_required
 def delete_slide(id):
     slide = Slide.query.get_or_404(id)
-    
-    # Delete file if exists
-    if slide.file_path:
-        file_path = os.path.join(app.config['SLIDES_FOLDER'], slide.file_path)
-        if os.path.exists(file_path):
-            try:
-                os.remove(file_path)
-            except:
-                pass
+    file_path = os.path.join(app.config['SLIDES_FOLDER'], slide.file_path) if slide.file_path else None
     
     db.session.delete(slide)
     db.session.commit()
+    # Delete the file once the row is gone
+    if file_path:
+        unlink_in_background(file_path, 'slide file')
+        for cache_path in slide_text_cache_files(file_path):
+            unlink_in_background(cache_path, 'slide text cache')
     flash('Slide deleted successfully.', 'success')
     return redirect(url_for('slides'))
 
 
+# Common English worship-related words and phrases
+# If title contains these, it's likely English
+ENGLISH_TITLE_INDICATORS = [
+    'amazing', 'grace', 'great', 'good', 'love', 'lord', 'god', 'jesus', 'christ',
+    'holy', 'spirit', 'praise', 'worship', 'bless', 'blessed', 'blessing',
+    'glory', 'glorious', 'power', 'mighty', 'king', 'kingdom', 'heaven',
+    'earth', 'forever', 'eternal', 'faith', 'hope', 'peace', 'joy', 'light',
+    'darkness', 'victory', 'salvation', 'redeem', 'redeemer', 'savior', 'save',
+    'cross', 'blood', 'sacrifice', 'resurrection', 'risen', 'ascend', 'come',
+    'go', 'walk', 'run', 'stand', 'sit', 'sing', 'dance', 'shout', 'cry',
+    'pray', 'prayer', 'thank', 'thanks', 'grateful', 'gratitude', 'mercy',
+    'mercies', 'compassion', 'kindness', 'gentle', 'humble', 'meek', 'strong',
+    'strength', 'weak', 'weakness', 'heal', 'healing', 'restore', 'restoration',
+    'revive', 'revival', 'awaken', 'awakening', 'breakthrough', 'break', 'through',
+    'freedom', 'free', 'liberty', 'deliver', 'deliverance', 'protect', 'protection',
+    'shield', 'refuge', 'shelter', 'fortress', 'tower', 'rock', 'stone', 'cornerstone',
+    'foundation', 'corner', 'stone', 'pillar', 'anchor', 'hope', 'trust', 'believe',
+    'faith', 'faithful', 'faithfulness', 'true', 'truth', 'honest', 'honesty',
+    'pure', 'purity', 'clean', 'cleanse', 'wash', 'white', 'snow', 'wool',
+    'lamb', 'sheep', 'shepherd', 'pastor', 'flock', 'fold', 'green', 'pasture',
+    'still', 'waters', 'valley', 'shadow', 'death', 'rod', 'staff', 'comfort',
+    'table', 'presence', 'enemies', 'anoint', 'anointing', 'oil', 'cup', 'overflow',
+    'goodness', 'mercy', 'follow', 'dwell', 'house', 'forever', 'eternity',
+    'hillsong', 'bethel', 'elevation', 'passion', 'tomlin', 'redman', 'hughes',
+    'stanfill', 'carnes', 'maher', 'baloche', 'townend', 'getty', 'wickham',
+    'mullins', 'chapman', 'grant', 'crouch', 'gaither', 'smith', 'wesley',
+    'newton', 'crosby', 'fanny', 'crosby', 'watts', 'isaac', 'wesley', 'charles'
+]
+
+# Common Tagalog/Filipino worship-related words and phrases
+TAGALOG_TITLE_INDICATORS = [
+    'araw', 'tahanan', 'panginoon', 'katapatan', 'binabago', 'baliw',
+    'banal', 'dakilang', 'salamat', 'puri', 'awit', 'dasal', 'pag-ibig',
+    'biyaya', 'kapangyarihan', 'kaluwalhatian', 'kabanalan', 'panalangin',
+    'pagsamba', 'papuri', 'kagalakan', 'kapayapaan', 'kaligtasan',
+    'katulad', 'tulad', 'walang', 'mayroon', 'ninyo', 'nila', 'namin',
+    'iyan', 'iyon', 'dito', 'doon', 'kapag', 'dahil', 'kaya', 'opo',
+    'sige', 'tama', 'mali', 'hindi', 'oo', 'hindi po', 'ng', 'sa', 'ang',
+    'mga', 'na', 'ay', 'ko', 'mo', 'niya', 'ito', 'kung', 'pero', 'at', 'o'
+]
+
+# Compiled once; whole-word matches so short words like 'at' or 'ng' don't hit inside other words
+ENGLISH_TITLE_RE = re.compile(r'\b(?:' + '|'.join(map(re.escape, ENGLISH_TITLE_INDICATORS)) + r')\b', re.IGNORECASE)
+TAGALOG_TITLE_RE = re.compile(r'\b(?:' + '|'.join(map(re.escape, TAGALOG_TITLE_INDICATORS)) + r')\b', re.IGNORECASE)
+
+
 def detect_language_from_title(title):
     """Detect language based on title content - defaults to Tagalog if not clearly English"""
     if not title:
-        return 'tagalog'  # Default to Tagalog
-    
-    title_lower = title.lower().strip()
-    
-    # Common English worship-related words and phrases
-    # If title contains these, it's likely English
-    english_indicators = [
-        'amazing', 'grace', 'great', 'good', 'love', 'lord', 'god', 'jesus', 'christ',
-        'holy', 'spirit', 'praise', 'worship', 'bless', 'blessed', 'blessing',
-        'glory', 'glorious', 'power', 'mighty', 'king', 'kingdom', 'heaven',
-        'earth', 'forever', 'eternal', 'faith', 'hope', 'peace', 'joy', 'light',
-        'darkness', 'victory', 'salvation', 'redeem', 'redeemer', 'savior', 'save',
-        'cross', 'blood', 'sacrifice', 'resurrection', 'risen', 'ascend', 'come',
-        'go', 'walk', 'run', 'stand', 'sit', 'sing', 'dance', 'shout', 'cry',
-        'pray', 'prayer', 'thank', 'thanks', 'grateful', 'gratitude', 'mercy',
-        'mercies', 'compassion', 'kindness', 'gentle', 'humble', 'meek', 'strong',
-        'strength', 'weak', 'weakness', 'heal', 'healing', 'restore', 'restoration',
-        'revive', 'revival', 'awaken', 'awakening', 'breakthrough', 'break', 'through',
-        'freedom', 'free', 'liberty', 'deliver', 'deliverance', 'protect', 'protection',
-        'shield', 'refuge', 'shelter', 'fortress', 'tower', 'rock', 'stone', 'cornerstone',
-        'foundation', 'corner', 'stone', 'pillar', 'anchor', 'hope', 'trust', 'believe',
-        'faith', 'faithful', 'faithfulness', 'true', 'truth', 'honest', 'honesty',
-        'pure', 'purity', 'clean', 'cleanse', 'wash', 'white', 'snow', 'wool',
-        'lamb', 'sheep', 'shepherd', 'pastor', 'flock', 'fold', 'green', 'pasture',
-        'still', 'waters', 'valley', 'shadow', 'death', 'rod', 'staff', 'comfort',
-        'table', 'presence', 'enemies', 'anoint', 'anointing', 'oil', 'cup', 'overflow',
-        'goodness', 'mercy', 'follow', 'dwell', 'house', 'forever', 'eternity',
-        'hillsong', 'bethel', 'elevation', 'passion', 'tomlin', 'redman', 'hughes',
-        'stanfill', 'carnes', 'maher', 'baloche', 'townend', 'getty', 'wickham',
-        'mullins', 'chapman', 'grant', 'crouch', 'gaither', 'smith', 'wesley',
-        'newton', 'crosby', 'fanny', 'crosby', 'watts', 'isaac', 'wesley', 'charles'
-    ]
-    
-    # Common Tagalog/Filipino worship-related words and phrases
-    tagalog_indicators = [
-        'araw', 'tahanan', 'panginoon', 'katapatan', 'binabago', 'baliw',
-        'banal', 'dakilang', 'salamat', 'puri', 'awit', 'dasal', 'pag-ibig',
-        'biyaya', 'kapangyarihan', 'kaluwalhatian', 'kabanalan', 'panalangin',
-        'pagsamba', 'papuri', 'kagalakan', 'kapayapaan', 'kaligtasan',
-        'katulad', 'tulad', 'walang', 'mayroon', 'ninyo', 'nila', 'namin',
-        'iyan', 'iyon', 'dito', 'doon', 'kapag', 'dahil', 'kaya', 'opo',
-        'sige', 'tama', 'mali', 'hindi', 'oo', 'hindi po', 'ng', 'sa', 'ang',
-        'mga', 'na', 'ay', 'ko', 'mo', 'niya', 'ito', 'kung', 'pero', 'at', 'o'
-    ]
+        return 'tagalog'  # Default to Tagalog
     
+    # Normalize before the cache lookup so case/whitespace variants share an entry
+    return _detect_language_cached(title.lower().strip())
+
+
+@lru_cache(maxsize=4096)
+def _detect_language_cached(title_lower):
+    """detect_language_from_title for a normalized title"""
     # First check for explicit Tagalog words
-    for indicator in tagalog_indicators:
-        if indicator in title_lower:
-            return 'tagalog'
+    if TAGALOG_TITLE_RE.search(title_lower):
+        return 'tagalog'
     
     # Then check for English words - if found, it's English
-    for indicator in english_indicators:
-        if indicator in title_lower:
-            return 'english'
+    if ENGLISH_TITLE_RE.search(title_lower):
+        return 'english'
     
     # Default to Tagalog if not clearly English
     return 'tagalog'
@@ -2753,13 +3037,10 @@ def bulk_change_language():
             flash('No valid slides selected.', 'warning')
             return redirect(url_for('slides'))
         
-        # Update language for selected slides
-        updated_count = 0
-        for slide_id in slide_ids:
-            slide = Slide.query.get(slide_id)
-            if slide:
-                slide.language = language
-                updated_count += 1
+        # Update language for selected slides in one UPDATE; rowcount skips ids that don't exist
+        updated_count = Slide.query.filter(Slide.id.in_(slide_ids)).update(
+            {'language': language}, synchronize_session=False
+        )
         
         db.session.commit()
         flash(f'Successfully updated language to {language.title()} for {updated_count} slide(s).', 'success')
@@ -2774,30 +3055,36 @@ def bulk_change_language():
 @admin_required
 def fix_slide_titles():
     """Fix all slide titles: replace underscores with spaces and auto-detect language"""
-    slides = Slide.query.all()
-    updated_count = 0
+    from sqlalchemy import update  # type: ignore
+    # Only the columns involved, as plain rows instead of full Slide objects
+    slide_rows = db.session.query(Slide.id, Slide.title, Slide.language).all()
+    changes = []
     title_updates = 0
     language_updates = 0
     
-    for slide in slides:
-        original_title = slide.title
+    for slide_id, original_title, current_language in slide_rows:
         cleaned_title = clean_slide_title(original_title)
-        title_changed = False
+        change = {}
         
         # Update title if it had underscores
         if cleaned_title != original_title:
-            slide.title = cleaned_title
-            title_changed = True
+            change['title'] = cleaned_title
             title_updates += 1
         
         # Always re-detect and set language based on cleaned title
         detected_language = detect_language_from_title(cleaned_title)
-        if slide.language != detected_language:
-            slide.language = detected_language
+        if current_language != detected_language:
+            change['language'] = detected_language
             language_updates += 1
         
-        if title_changed or slide.language != detected_language:
-            updated_count += 1
+        if change:
+            change['id'] = slide_id
+            changes.append(change)
+    
+    updated_count = len(changes)
+    if changes:
+        # Bulk UPDATE by primary key, grouped into executemany batches by changed columns
+        db.session.execute(update(Slide), changes)
     
     if updated_count > 0:
         db.session.commit()
@@ -2818,59 +3105,40 @@ def fix_slide_titles():
 @login_required
 def notifications_page():
     """Notifications page showing all notifications"""
+    import hashlib
+    from flask import session  # type: ignore
+    from sqlalchemy import case  # type: ignore
+    from sqlalchemy.orm import selectinload  # type: ignore
+    
+    # Cheap fingerprint of the user's notifications so unchanged polls get a 304 without the
+    # list query and render; the minute bucket keeps the "time ago" labels from going stale
+    total, latest_id, unread = db.session.query(
+        func.count(Notification.id),
+        func.max(Notification.id),
+        func.sum(case((Notification.is_read == False, 1), else_=0))
+    ).filter(Notification.user_id == current_user.id).one()
+    etag = hashlib.md5(f"{current_user.id}:{total}:{latest_id}:{unread}:{int(time.time() // 60)}".encode()).hexdigest()
+    # Pending flash messages are rendered into the page, so those responses can't be reused
+    if etag in request.if_none_match and '_flashes' not in session:
+        response = make_response('', 304)
+        response.set_etag(etag)
+        return response
+    
     # Force fresh query to avoid caching issues
-    notifications = Notification.query.filter_by(user_id=current_user.id).order_by(Notification.created_at.desc()).all()
-    unread_count = Notification.query.filter_by(user_id=current_user.id, is_read=False).count()
+    # Related rows used in the text/links below load with one IN query each instead of per notification
+    notifications = Notification.query.options(
+        selectinload(Notification.actor),
+        selectinload(Notification.post),
+        selectinload(Notification.practice),
+        selectinload(Notification.leave_request)
+    ).filter_by(user_id=current_user.id).order_by(Notification.created_at.desc()).all()
+    # The list is every notification for the user, so count unread ones from it
+    unread_count = sum(1 for notif in notifications if not notif.is_read)
     
     # Format notifications for display
     notifications_list = []
     for notif in notifications:
-        actor_name = notif.actor.get_display_name() if notif.actor else 'Someone'
-        notification_text = ''
-        link = '#'
-        icon = '🔔'
-        
-        if notif.notification_type == 'like':
-            notification_text = f"{actor_name} liked your post"
-            icon = '👍'
-            if notif.post:
-                link = url_for('view_musician_profile', id=notif.post.musician_id)
-        elif notif.notification_type == 'heart':
-            notification_text = f"{actor_name} ❤️ your post"
-            icon = '❤️'
-            if notif.post:
-                link = url_for('view_musician_profile', id=notif.post.musician_id)
-        elif notif.notification_type == 'share':
-            notification_text = f"{actor_name} shared your post"
-            icon = '🔄'
-            if notif.post:
-                link = url_for('view_musician_profile', id=notif.post.musician_id)
-        elif notif.notification_type == 'comment':
-            notification_text = f"{actor_name} commented on your post"
-            icon = '💬'
-            if notif.post:
-                link = url_for('view_musician_profile', id=notif.post.musician_id)
-        elif notif.notification_type == 'practice':
-            notification_text = f"{actor_name} created a new practice schedule"
-            icon = '📅'
-            if notif.practice:
-                link = url_for('practice_detail', id=notif.practice.id)
-        elif notif.notification_type == 'leave_request':
-            notification_text = f"{actor_name} filed a leave request for your approval"
-            icon = '📋'
-            link = '#'  # Will be handled by JavaScript to show popup
-        elif notif.notification_type == 'leave_approved':
-            notification_text = f"Your leave request has been approved by {actor_name}"
-            icon = '✅'
-            link = url_for('leave_requests')
-        elif notif.notification_type == 'leave_rejected':
-            # Include rejection reason if available
-            if notif.leave_request and notif.leave_request.review_notes:
-                notification_text = f"Your leave request has been rejected by {actor_name}. Reason: {notif.leave_request.review_notes}"
-            else:
-                notification_text = f"Your leave request has been rejected by {actor_name}"
-            icon = '❌'
-            link = url_for('leave_requests')
+        icon, notification_text, link = format_notification(notif)
         
         notification_item = {
             'id': notif.id,
@@ -2892,8 +3160,9 @@ def notifications_page():
     response = make_response(render_template('notifications.html', 
                          notifications=notifications_list, 
                          unread_count=unread_count))
-    # Prevent caching to ensure fresh data
-    response.headers['Cache-Control'] = 'no-cache, no-store, must-revalidate'
+    # Always revalidate to ensure fresh data; the ETag lets unchanged pages come back as 304
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'private, no-cache, must-revalidate'
     response.headers['Pragma'] = 'no-cache'
     response.headers['Expires'] = '0'
     return response
@@ -2903,7 +3172,8 @@ def notifications_page():
 @admin_required
 def announcements():
     """List all event announcements"""
-    announcements_list = EventAnnouncement.query.order_by(EventAnnouncement.display_order, EventAnnouncement.created_at.desc()).all()
+    # Read-only listing: plain row mappings skip ORM identity-map bookkeeping
+    announcements_list = db.session.execute(ANNOUNCEMENT_LIST_STMT).mappings().all()
     return render_template('announcements.html', announcements=announcements_list)
 
 
@@ -2928,7 +3198,7 @@ def add_announcement():
                 announcements_dir = app.config['ANNOUNCEMENTS_FOLDER']
                 os.makedirs(announcements_dir, exist_ok=True)
                 file_path_full = os.path.join(announcements_dir, filename)
-                file.save(file_path_full)
+                save_upload(file, file_path_full)
                 image_path = f"announcements/{filename}"
                 flash(f'Image uploaded: {filename}', 'info')
         
@@ -2992,7 +3262,7 @@ def edit_announcement(id):
                 announcements_dir = app.config['ANNOUNCEMENTS_FOLDER']
                 os.makedirs(announcements_dir, exist_ok=True)
                 file_path_full = os.path.join(announcements_dir, filename)
-                file.save(file_path_full)
+                save_upload(file, file_path_full)
                 announcement.image_path = f"announcements/{filename}"
                 flash(f'Image uploaded: {filename}', 'info')
         
@@ -3051,6 +3321,375 @@ def delete_announcement(id):
 
 
 
+# Slide file types whose text comes out of a document parser; their extracted text is
+# cached on disk, keyed by the file's path, mtime and size
+SLIDE_TEXT_CACHE_KINDS = frozenset({'word', 'excel', 'pdf', 'powerpoint'})
+
+# Extracted slide text lives under the instance folder, outside the public static tree
+SLIDE_TEXT_CACHE_DIR = os.path.join(app.instance_path, 'slide_text_cache')
+os.makedirs(SLIDE_TEXT_CACHE_DIR, exist_ok=True)
+
+# Rows of a CSV slide rendered by the viewer; larger files are truncated with a note
+SLIDE_CSV_MAX_ROWS = 10000
+
+
+def slide_content_kind(file_type, ext):
+    """Which reader view_slide uses for a file: word, excel, csv, pdf, txt, image, powerpoint or None"""
+    if file_type == 'word' or ext in ['.doc', '.docx']:
+        return 'word'
+    if file_type == 'excel' or ext in ['.xls', '.xlsx']:
+        return 'excel'
+    if file_type == 'csv' or ext == '.csv':
+        return 'csv'
+    if file_type == 'pdf' or ext == '.pdf':
+        return 'pdf'
+    if file_type == 'txt' or ext == '.txt':
+        return 'txt'
+    if file_type == 'image' or ext in ['.jpg', '.jpeg', '.png', '.gif']:
+        return 'image'
+    if file_type == 'powerpoint' or ext in ['.ppt', '.pptx']:
+        return 'powerpoint'
+    return None
+
+
+WORD_NS = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+DOCX_REL_NS = '{http://schemas.openxmlformats.org/officeDocument/2006/relationships}'
+DOCX_PACKAGE_REL_NS = '{http://schemas.openxmlformats.org/package/2006/relationships}'
+
+
+def _docx_run_text(run):
+    """Text of a w:r element, matching python-docx's Run.text"""
+    parts = []
+    for child in run:
+        if child.tag == WORD_NS + 't':
+            parts.append(child.text or '')
+        elif child.tag in (WORD_NS + 'tab', WORD_NS + 'ptab'):
+            parts.append('\t')
+        elif child.tag == WORD_NS + 'br':
+            # Only line breaks become newlines; page and column breaks render as nothing
+            if child.get(WORD_NS + 'type') in (None, 'textWrapping'):
+                parts.append('\n')
+        elif child.tag == WORD_NS + 'cr':
+            parts.append('\n')
+        elif child.tag == WORD_NS + 'noBreakHyphen':
+            parts.append('-')
+    return ''.join(parts)
+
+
+def _docx_paragraph_text(paragraph):
+    """Text of a w:p element the way python-docx renders it.
+    
+    Only the paragraph's own runs and hyperlink runs count - runs nested in text boxes or
+    mc:AlternateContent (whose Choice and Fallback repeat the same text) are skipped.
+    """
+    parts = []
+    for child in paragraph:
+        if child.tag == WORD_NS + 'r':
+            parts.append(_docx_run_text(child))
+        elif child.tag == WORD_NS + 'hyperlink':
+            parts.extend(_docx_run_text(run) for run in child.iterchildren(WORD_NS + 'r'))
+    return ''.join(parts)
+
+
+def _docx_section_paragraphs(docx_zip, root, kind):
+    """Non-empty paragraph texts of each section's default header or footer (kind), in section order.
+    
+    Like python-docx's section.header/footer: a section without its own default reference
+    is linked to the previous section's, and first-page/even-page variants are ignored.
+    """
+    from lxml import etree  # type: ignore
+    rels_root = etree.fromstring(docx_zip.read('word/_rels/document.xml.rels'))
+    targets = {}
+    for rel in rels_root.iterchildren(DOCX_PACKAGE_REL_NS + 'Relationship'):
+        target = rel.get('Target', '')
+        targets[rel.get('Id')] = target.lstrip('/') if target.startswith('/') else 'word/' + target
+    
+    paragraphs_by_part = {}
+    texts = []
+    current_part = None
+    for sect_pr in root.xpath('./w:body/w:p/w:pPr/w:sectPr | ./w:body/w:sectPr',
+                              namespaces={'w': WORD_NS[1:-1]}):
+        for reference in sect_pr.iterchildren(WORD_NS + kind + 'Reference'):
+            if reference.get(WORD_NS + 'type') == 'default':
+                current_part = targets.get(reference.get(DOCX_REL_NS + 'id'))
+                break
+        if not current_part:
+            continue
+        if current_part not in paragraphs_by_part:
+            part_root = etree.fromstring(docx_zip.read(current_part))
+            paragraphs_by_part[current_part] = [
+                text for text in (
+                    _docx_paragraph_text(paragraph).strip() for paragraph in part_root.iterchildren(WORD_NS + 'p')
+                ) if text
+            ]
+        texts.extend(paragraphs_by_part[current_part])
+    return texts
+
+
+def extract_docx_text(file_path):
+    """Text of a .docx for the slide viewer: headers, body paragraphs, tables, then footers.
+    
+    Walks word/document.xml once with lxml instead of building python-docx wrapper objects
+    for every paragraph, table, row and cell.
+    """
+    import zipfile
+    from lxml import etree  # type: ignore
+    with zipfile.ZipFile(file_path) as docx_zip:
+        root = etree.fromstring(docx_zip.read('word/document.xml'))
+        # As before, a broken header or footer shouldn't hide the body text
+        try:
+            headers = _docx_section_paragraphs(docx_zip, root, 'header')
+        except Exception:
+            headers = []
+        try:
+            footers = _docx_section_paragraphs(docx_zip, root, 'footer')
+        except Exception:
+            footers = []
+    
+    body = root.find(WORD_NS + 'body')
+    if body is None:
+        body = etree.Element(WORD_NS + 'body')
+    
+    # Headers first, then body paragraphs, then tables, then footers - all written into one buffer
+    buf = io.StringIO()
+    if headers:
+        buf.write("HEADERS:\n" + "\n".join(headers) + "\n" + "-"*60 + "\n\n")
+    
+    body_start = buf.tell()
+    
+    def write_line(text):
+        if buf.tell() > body_start:
+            buf.write('\n')
+        buf.write(text)
+    
+    for paragraph in body.iterchildren(WORD_NS + 'p'):
+        para_text = _docx_paragraph_text(paragraph).strip()
+        if para_text:
+            write_line(para_text)
+    
+    # Tables are listed after the body text, each framed by separators
+    for table_count, table in enumerate(body.iterchildren(WORD_NS + 'tbl'), 1):
+        write_line(f"\n{'='*60}\nTABLE {table_count}\n{'='*60}")
+        for row in table.iterchildren(WORD_NS + 'tr'):
+            row_cells = []
+            for cell in row.iterchildren(WORD_NS + 'tc'):
+                cell_text_parts = [text for text in (
+                    _docx_paragraph_text(cell_para).strip() for cell_para in cell.iterchildren(WORD_NS + 'p')
+                ) if text]
+                row_cells.append(' | '.join(cell_text_parts))
+            
+            # Only add non-empty rows
+            if any(row_cells):
+                write_line(' | '.join(row_cells))
+        write_line(f"\n{'='*60}\n")
+    
+    if footers:
+        buf.write("\n\n" + "-"*60 + "\nFOOTERS:\n" + "\n".join(footers))
+    
+    return buf.getvalue()
+
+
+def _pdfium_page_texts(file_path):
+    """Text of each PDF page via PDFium (pypdfium2), much faster than PyPDF2's pure-Python extractor"""
+    import pypdfium2 as pdfium  # type: ignore
+    pdf = pdfium.PdfDocument(file_path)
+    try:
+        texts = []
+        for page in pdf:
+            textpage = page.get_textpage()
+            texts.append(textpage.get_text_range())
+            textpage.close()
+            page.close()
+        return texts
+    finally:
+        pdf.close()
+
+
+def extract_slide_text(file_path, kind):
+    """Extract the viewable text of a slide file; returns (content, content_type)"""
+    content = None
+    content_type = None
+    if kind == 'word':
+        # Read Word document - paragraphs, tables, headers and footers straight from the XML
+        try:
+            content = extract_docx_text(file_path)
+            content_type = 'text'
+        except ImportError:
+            content = "Error: lxml library not installed. Cannot read Word documents."
+            content_type = 'error'
+        except Exception as e:
+            import traceback
+            content = f"Error reading Word document: {str(e)}\n{traceback.format_exc()}"
+            content_type = 'error'
+    
+    elif kind == 'excel':
+        # Read Excel file - use openpyxl (more reliable, no compilation needed)
+        try:
+            import openpyxl  # type: ignore
+            # Read-only mode streams each sheet's XML instead of building every cell object.
+            # Formulas are still shown as written, as before (cached values may be missing).
+            wb = openpyxl.load_workbook(file_path, read_only=True)
+            try:
+                buf = io.StringIO()
+                
+                def write_line(text):
+                    if buf.tell():
+                        buf.write('\n')
+                    buf.write(text)
+                
+                for sheet in wb.worksheets:
+                    write_line(f"=== Sheet: {sheet.title} ===\n")
+                    # Read-only sheets stop at the stored dimension, which some exporters get wrong
+                    sheet.reset_dimensions()
+                    rows = (['' if cell is None else str(cell) for cell in row] for row in sheet.iter_rows(values_only=True))
+                    for row in rows:
+                        if any(row):  # Skip empty rows
+                            write_line('\t'.join(row))
+                    write_line("\n")
+            finally:
+                wb.close()
+            content = buf.getvalue()
+            content_type = 'text'
+        except ImportError:
+            content = "Error: openpyxl library not installed. Cannot read Excel files."
+            content_type = 'error'
+        except Exception as e:
+            content = f"Error reading Excel file: {str(e)}"
+            content_type = 'error'
+    
+    elif kind == 'csv':
+        # Read CSV file
+        try:
+            import csv
+            from itertools import islice
+            with open(file_path, 'r', encoding='utf-8', errors='ignore', buffering=1 << 20, newline='') as f:
+                reader = csv.reader(f)
+                # One pass straight into the joined text, capped at what the viewer can show
+                content = '\n'.join('\t'.join(row) for row in islice(reader, SLIDE_CSV_MAX_ROWS))
+                if next(reader, None) is not None:
+                    content += f"\n\n... Showing the first {SLIDE_CSV_MAX_ROWS:,} rows. Download the file to see the rest."
+            content_type = 'text'
+        except Exception as e:
+            content = f"Error reading CSV file: {str(e)}"
+            content_type = 'error'
+    
+    elif kind == 'pdf':
+        # Read PDF file
+        try:
+            try:
+                text_parts = _pdfium_page_texts(file_path)
+            except ImportError:
+                # Pure-Python fallback when pypdfium2 isn't installed
+                import PyPDF2  # type: ignore
+                with open(file_path, 'rb') as f:
+                    pdf_reader = PyPDF2.PdfReader(f)
+                    text_parts = [page.extract_text() for page in pdf_reader.pages]
+            content = '\n\n'.join(
+                f"--- Page {page_num} ---\n{text}"
+                for page_num, text in enumerate(text_parts, 1) if text.strip()
+            )
+            content_type = 'text'
+        except ImportError:
+            content = "Error: PyPDF2 library not installed. Cannot read PDF files."
+            content_type = 'error'
+        except Exception as e:
+            content = f"Error reading PDF file: {str(e)}"
+            content_type = 'error'
+    
+    elif kind == 'txt':
+        # Read text file
+        try:
+            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
+                content = f.read()
+            content_type = 'text'
+        except Exception as e:
+            content = f"Error reading text file: {str(e)}"
+            content_type = 'error'
+    
+    elif kind == 'powerpoint':
+        # Read PowerPoint
+        try:
+            from pptx import Presentation  # type: ignore
+            prs = Presentation(file_path)
+            buf = io.StringIO()
+            for slide_obj in prs.slides:
+                for shape in slide_obj.shapes:
+                    shape_text = shape.text.strip() if hasattr(shape, "text") else ''
+                    if shape_text:
+                        if buf.tell():
+                            buf.write('\n\n')
+                        buf.write(shape_text)
+            content = buf.getvalue()
+            content_type = 'text'
+        except Exception as e:
+            content = f"Error reading PowerPoint file: {str(e)}"
+            content_type = 'error'
+    
+    return content, content_type
+
+
+def slide_text_cache_key(file_path):
+    """Cache file name prefix for a slide file, derived from its absolute path"""
+    import hashlib
+    return hashlib.sha1(os.path.abspath(file_path).encode('utf-8')).hexdigest()
+
+
+def slide_text_cache_files(file_path):
+    """Cached text files written for a slide file (any mtime/size)"""
+    import glob
+    return glob.glob(os.path.join(glob.escape(SLIDE_TEXT_CACHE_DIR), slide_text_cache_key(file_path) + '.*.cache'))
+
+
+class SlideTextError(Exception):
+    """Extraction failed; carries the error message view_slide shows instead of the text"""
+
+
+@lru_cache(maxsize=64)
+def _cached_slide_text(file_path, kind, mtime_ns, size):
+    """Extracted slide text from the on-disk cache, parsing and writing it on a miss.
+    
+    The in-process LRU sits in front of the disk cache; both are keyed by mtime and size,
+    so replacing the file invalidates them. Failures raise SlideTextError so that neither
+    cache keeps them - the next view retries the extraction.
+    """
+    cache_path = os.path.join(SLIDE_TEXT_CACHE_DIR, f"{slide_text_cache_key(file_path)}.{mtime_ns}-{size}.cache")
+    try:
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            return f.read()
+    except FileNotFoundError:
+        pass
+    
+    content, content_type = extract_slide_text(file_path, kind)
+    if content_type != 'text':
+        raise SlideTextError(content)
+    
+    # Drop text cached for earlier versions of the file, then write atomically
+    for stale_path in slide_text_cache_files(file_path):
+        safe_unlink(stale_path, 'stale slide text cache')
+    tmp_path = None
+    try:
+        fd, tmp_path = tempfile.mkstemp(dir=SLIDE_TEXT_CACHE_DIR, suffix='.tmp')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(content)
+        os.replace(tmp_path, cache_path)
+    except OSError as e:
+        print(f"Warning: Could not cache slide text: {e}")
+        if tmp_path:
+            safe_unlink(tmp_path, 'slide text cache temp file')
+    return content
+
+
+def read_slide_text(file_path, kind):
+    """Slide text for view_slide, served from cache for the parsed document formats"""
+    if kind not in SLIDE_TEXT_CACHE_KINDS:
+        return extract_slide_text(file_path, kind)
+    stat = os.stat(file_path)
+    try:
+        return _cached_slide_text(file_path, kind, stat.st_mtime_ns, stat.st_size), 'text'
+    except SlideTextError as e:
+        return str(e), 'error'
+
+
 @app.route('/slides/<int:id>/view')
 @login_required
 def view_slide(id):
@@ -3081,188 +3720,24 @@ def view_slide(id):
     content = None
     content_type = None
     file_type = slide.file_type or detect_file_type_from_extension(filename)
+    kind = slide_content_kind(file_type, ext)
     
     try:
-        if file_type == 'word' or ext in ['.doc', '.docx']:
-            # Read Word document - extract ALL content including tables, images, formatting
-            try:
-                from docx import Document  # type: ignore
-                
-                doc = Document(file_path)
-                content_parts = []
-                
-                # Extract ALL paragraphs in order (Word docs don't have "pages" - just paragraphs)
-                # This will get ALL content from the entire document
-                for para in doc.paragraphs:
-                    para_text = para.text.strip()
-                    if para_text:
-                        content_parts.append(para_text)
-                
-                # Extract ALL tables (tables exist separately from paragraphs)
-                for idx, table in enumerate(doc.tables):
-                    content_parts.append(f"\n{'='*60}\nTABLE {idx + 1}\n{'='*60}")
-                    
-                    # Extract table with better formatting
-                    for row in table.rows:
-                        row_cells = []
-                        for cell in row.cells:
-                            # Get all text from cell, preserving content
-                            cell_text_parts = []
-                            for cell_para in cell.paragraphs:
-                                if cell_para.text.strip():
-                                    cell_text_parts.append(cell_para.text.strip())
-                            cell_text = ' | '.join(cell_text_parts) if len(cell_text_parts) > 1 else (cell_text_parts[0] if cell_text_parts else '')
-                            row_cells.append(cell_text)
-                        
-                        # Only add non-empty rows
-                        if any(cell for cell in row_cells):
-                            # Format as table row
-                            table_row = ' | '.join(row_cells)
-                            content_parts.append(table_row)
-                    
-                    content_parts.append(f"\n{'='*60}\n")
-                
-                # Extract headers from all sections
-                headers = []
-                try:
-                    for section in doc.sections:
-                        if section.header:
-                            for para in section.header.paragraphs:
-                                if para.text.strip():
-                                    headers.append(para.text.strip())
-                except:
-                    pass
-                
-                # Extract footers from all sections
-                footers = []
-                try:
-                    for section in doc.sections:
-                        if section.footer:
-                            for para in section.footer.paragraphs:
-                                if para.text.strip():
-                                    footers.append(para.text.strip())
-                except:
-                    pass
-                
-                # Combine all content with headers first, then body, then footers
-                full_content = []
-                if headers:
-                    full_content.append("HEADERS:\n" + "\n".join(headers) + "\n" + "-"*60 + "\n")
-                
-                full_content.append("\n".join(content_parts))
-                
-                if footers:
-                    full_content.append("\n" + "-"*60 + "\nFOOTERS:\n" + "\n".join(footers))
-                
-                content = "\n".join(full_content)
-                content_type = 'text'
-                    
-            except ImportError:
-                content = "Error: python-docx library not installed. Cannot read Word documents."
-                content_type = 'error'
-            except Exception as e:
-                import traceback
-                content = f"Error reading Word document: {str(e)}\n{traceback.format_exc()}"
-                content_type = 'error'
-        
-        # If we have Word/Excel/PDF, provide file URL for embedded viewer
-        if content_type == 'text' and file_type in ['word', 'excel', 'pdf']:
-            file_url = url_for('static', filename=f'slides/{filename}')
-            return render_template('view_slide.html', slide=slide, content=content, content_type=content_type, 
-                                 file_type=file_type, file_url=file_url, embedded_view=True)
-        
-        elif file_type == 'excel' or ext in ['.xls', '.xlsx']:
-            # Read Excel file - use openpyxl (more reliable, no compilation needed)
-            try:
-                import openpyxl  # type: ignore
-                wb = openpyxl.load_workbook(file_path)
-                content_parts = []
-                for sheet_name in wb.sheetnames:
-                    sheet = wb[sheet_name]
-                    content_parts.append(f"=== Sheet: {sheet_name} ===\n")
-                    for row in sheet.iter_rows(values_only=True):
-                        row_data = [str(cell) if cell is not None else '' for cell in row]
-                        if any(cell for cell in row_data):  # Skip empty rows
-                            content_parts.append('\t'.join(row_data))
-                    content_parts.append("\n")
-                content = '\n'.join(content_parts)
-                content_type = 'text'
-            except ImportError:
-                content = "Error: openpyxl library not installed. Cannot read Excel files."
-                content_type = 'error'
-            except Exception as e:
-                content = f"Error reading Excel file: {str(e)}"
-                content_type = 'error'
-        
-        elif file_type == 'csv' or ext == '.csv':
-            # Read CSV file
-            try:
-                import csv
-                with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                    reader = csv.reader(f)
-                    rows = []
-                    for row in reader:
-                        rows.append('\t'.join(row))
-                    content = '\n'.join(rows)
-                content_type = 'text'
-            except Exception as e:
-                content = f"Error reading CSV file: {str(e)}"
-                content_type = 'error'
-        
-        elif file_type == 'pdf' or ext == '.pdf':
-            # Read PDF file
-            try:
-                import PyPDF2  # type: ignore
-                with open(file_path, 'rb') as f:
-                    pdf_reader = PyPDF2.PdfReader(f)
-                    text_parts = []
-                    for page_num, page in enumerate(pdf_reader.pages, 1):
-                        text = page.extract_text()
-                        if text.strip():
-                            text_parts.append(f"--- Page {page_num} ---\n{text}")
-                    content = '\n\n'.join(text_parts)
-                content_type = 'text'
-            except ImportError:
-                content = "Error: PyPDF2 library not installed. Cannot read PDF files."
-                content_type = 'error'
-            except Exception as e:
-                content = f"Error reading PDF file: {str(e)}"
-                content_type = 'error'
-        
-        elif file_type == 'txt' or ext == '.txt':
-            # Read text file
-            try:
-                with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                    content = f.read()
-                content_type = 'text'
-            except Exception as e:
-                content = f"Error reading text file: {str(e)}"
-                content_type = 'error'
-        
-        elif file_type == 'image' or ext in ['.jpg', '.jpeg', '.png', '.gif']:
+        if kind == 'image':
             # Display image
             content = url_for('static', filename=f'slides/{filename}')
             content_type = 'image'
-        
-        elif file_type == 'powerpoint' or ext in ['.ppt', '.pptx']:
-            # Read PowerPoint
-            try:
-                from pptx import Presentation  # type: ignore
-                prs = Presentation(file_path)
-                slide_texts = []
-                for idx, slide_obj in enumerate(prs.slides, 1):
-                    for shape in slide_obj.shapes:
-                        if hasattr(shape, "text") and shape.text.strip():
-                            slide_texts.append(shape.text.strip())
-                content = '\n\n'.join(slide_texts)
-                content_type = 'text'
-            except Exception as e:
-                content = f"Error reading PowerPoint file: {str(e)}"
-                content_type = 'error'
-        
+        elif kind:
+            content, content_type = read_slide_text(file_path, kind)
         else:
             content = f"File type '{ext}' is not supported for viewing."
             content_type = 'error'
+        
+        # If we have Word/Excel/PDF, provide file URL for embedded viewer
+        if kind == 'word' and content_type == 'text' and file_type in ['word', 'excel', 'pdf']:
+            file_url = url_for('static', filename=f'slides/{filename}')
+            return render_template('view_slide.html', slide=slide, content=content, content_type=content_type, 
+                                 file_type=file_type, file_url=file_url, embedded_view=True)
     
     except Exception as e:
         flash(f'Error reading Job Aid file: {str(e)}', 'danger')
@@ -3314,9 +3789,13 @@ def permissions():
     """Manage user permissions - Admin only"""
     form = PermissionForm()
     
-    # Populate user choices
-    users = User.query.filter(User.role != 'admin').order_by(User.username).all()
-    form.user_id.choices = [(u.id, f"{u.get_display_name()} ({u.username})") for u in users]
+    # Populate user choices from plain rows; only id and names are needed
+    user_rows = db.session.execute(
+        select(User.id, User.username, User.nickname)
+        .where(User.role != 'admin')
+        .order_by(User.username)
+    ).all()
+    form.user_id.choices = [(user_id, f"{nickname or username} ({username})") for user_id, username, nickname in user_rows]
     
     if form.validate_on_submit():
         user = User.query.get(form.user_id.data)
@@ -3332,10 +3811,9 @@ def permissions():
         
         # Update permissions
         for perm_type, granted in permission_types.items():
-            existing = UserPermission.query.filter_by(
-                user_id=user.id,
-                permission_type=perm_type
-            ).first()
+            existing = db.session.execute(
+                USER_PERMISSION_STMT, {'user_id': user.id, 'permission_type': perm_type}
+            ).scalars().first()
             
             if granted:
                 # Grant permission
@@ -3355,8 +3833,11 @@ def permissions():
         flash(f'Permissions updated for {user.get_display_name()}.', 'success')
         return redirect(url_for('permissions'))
     
-    # Get all users with their permissions
-    all_users = User.query.filter(User.role != 'admin').order_by(User.username).all()
+    # Get all users with their permissions (loaded in one extra IN query, not one per user)
+    from sqlalchemy.orm import selectinload  # type: ignore
+    all_users = User.query.filter(User.role != 'admin').options(
+        selectinload(User.permissions)
+    ).order_by(User.username).all()
     users_with_permissions = []
     for user in all_users:
         permissions_dict = {p.permission_type: True for p in user.permissions}
@@ -3374,18 +3855,12 @@ def tasks():
     """Tasks page with My Task Today and EOD Tasks"""
     today = date.today()
     
-    # Get today's tasks (pending and completed)
-    today_tasks = Task.query.filter_by(
-        user_id=current_user.id,
-        task_date=today
-    ).order_by(Task.priority.asc(), Task.created_at.asc()).all()
-    
-    # Separate pending and completed tasks
-    pending_tasks = [t for t in today_tasks if not t.is_completed]
-    completed_tasks_today = [t for t in today_tasks if t.is_completed]
+    # Today's tasks as plain rows, pending and completed in separate queries
+    task_params = {'user_id': current_user.id, 'task_date': today}
+    pending_tasks = db.session.execute(TODAY_PENDING_TASKS_STMT, task_params).mappings().all()
     
     # Get completed tasks for EOD summary (today's completed tasks)
-    eod_tasks = completed_tasks_today
+    eod_tasks = db.session.execute(TODAY_COMPLETED_TASKS_STMT, task_params).mappings().all()
     
     # Get current date in Manila timezone
     import pytz  # type: ignore
@@ -3393,7 +3868,7 @@ def tasks():
     current_date_manila = datetime.now(manila_tz).strftime('%B %d, %Y')
     
     # Get user's saved task options
-    task_options = TaskOption.query.filter_by(user_id=current_user.id).order_by(TaskOption.created_at.desc()).all()
+    task_options = db.session.execute(TASK_OPTIONS_STMT, {'user_id': current_user.id}).mappings().all()
     
     return render_template('tasks.html', 
                          pending_tasks=pending_tasks,
@@ -3407,36 +3882,8 @@ def tasks():
 @login_required
 def tools():
     """Tools page showing all tools"""
-    try:
-        tools_list = Tool.query.order_by(Tool.created_at.desc()).all()
-    except Exception as e:
-        # If error due to missing column, run migration and retry
-        if 'developer_name' in str(e) or 'no such column' in str(e).lower():
-            # Run migration using direct SQLite connection to ensure it works
-            import sqlite3
-            
-            db_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'instance', 'database.db')
-            if os.path.exists(db_path):
-                try:
-                    sqlite_conn = sqlite3.connect(db_path)
-                    cursor = sqlite_conn.cursor()
-                    cursor.execute("PRAGMA table_info(tool)")
-                    columns = [row[1] for row in cursor.fetchall()]
-                    
-                    if 'developer_name' not in columns:
-                        cursor.execute("ALTER TABLE tool ADD COLUMN developer_name VARCHAR(200)")
-                        sqlite_conn.commit()
-                    sqlite_conn.close()
-                except Exception as migration_error:
-                    print(f"Migration error: {migration_error}")
-            
-            # Also run the standard migration
-            migrate_database()
-            
-            # Retry the query
-            tools_list = Tool.query.order_by(Tool.created_at.desc()).all()
-        else:
-            raise
+    # Only the columns the cards render, as plain row mappings
+    tools_list = db.session.execute(TOOL_LIST_STMT).mappings().all()
     return render_template('tools.html', tools=tools_list)
 
 
@@ -3466,7 +3913,7 @@ def add_tool():
                     tools_dir = app.config['TOOLS_FOLDER']
                     os.makedirs(tools_dir, exist_ok=True)
                     file_path_full = os.path.join(tools_dir, filename)
-                    file.save(file_path_full)
+                    save_upload(file, file_path_full)
                     screenshot_path = f"tools/{filename}"
                 else:
                     flash('Invalid file type. Please upload JPG, PNG, or GIF images only.', 'danger')
@@ -3491,36 +3938,7 @@ def add_tool():
 @login_required
 def edit_tool(id):
     """Edit an existing tool"""
-    try:
-        tool = Tool.query.get_or_404(id)
-    except Exception as e:
-        # If error due to missing column, run migration and retry
-        if 'developer_name' in str(e) or 'no such column' in str(e).lower():
-            # Run migration using direct SQLite connection to ensure it works
-            import sqlite3
-            
-            db_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'instance', 'database.db')
-            if os.path.exists(db_path):
-                try:
-                    sqlite_conn = sqlite3.connect(db_path)
-                    cursor = sqlite_conn.cursor()
-                    cursor.execute("PRAGMA table_info(tool)")
-                    columns = [row[1] for row in cursor.fetchall()]
-                    
-                    if 'developer_name' not in columns:
-                        cursor.execute("ALTER TABLE tool ADD COLUMN developer_name VARCHAR(200)")
-                        sqlite_conn.commit()
-                    sqlite_conn.close()
-                except Exception as migration_error:
-                    print(f"Migration error: {migration_error}")
-            
-            # Also run the standard migration
-            migrate_database()
-            
-            # Retry the query
-            tool = Tool.query.get_or_404(id)
-        else:
-            raise
+    tool = Tool.query.get_or_404(id)
     
     # Only allow admin or team leader to edit
     if not current_user.is_admin() and not current_user.is_team_leader():
@@ -3558,7 +3976,7 @@ def edit_tool(id):
                     tools_dir = app.config['TOOLS_FOLDER']
                     os.makedirs(tools_dir, exist_ok=True)
                     file_path_full = os.path.join(tools_dir, filename)
-                    file.save(file_path_full)
+                    save_upload(file, file_path_full)
                     tool.screenshot = f"tools/{filename}"
                 else:
                     flash('Invalid file type. Please upload JPG, PNG, or GIF images only.', 'danger')
@@ -3574,36 +3992,7 @@ def edit_tool(id):
 @login_required
 def delete_tool(id):
     """Delete a tool"""
-    try:
-        tool = Tool.query.get_or_404(id)
-    except Exception as e:
-        # If error due to missing column, run migration and retry
-        if 'developer_name' in str(e) or 'no such column' in str(e).lower():
-            # Run migration using direct SQLite connection to ensure it works
-            import sqlite3
-            
-            db_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'instance', 'database.db')
-            if os.path.exists(db_path):
-                try:
-                    sqlite_conn = sqlite3.connect(db_path)
-                    cursor = sqlite_conn.cursor()
-                    cursor.execute("PRAGMA table_info(tool)")
-                    columns = [row[1] for row in cursor.fetchall()]
-                    
-                    if 'developer_name' not in columns:
-                        cursor.execute("ALTER TABLE tool ADD COLUMN developer_name VARCHAR(200)")
-                        sqlite_conn.commit()
-                    sqlite_conn.close()
-                except Exception as migration_error:
-                    print(f"Migration error: {migration_error}")
-            
-            # Also run the standard migration
-            migrate_database()
-            
-            # Retry the query
-            tool = Tool.query.get_or_404(id)
-        else:
-            raise
+    tool = Tool.query.get_or_404(id)
     
     # Only allow admin or team leader to delete
     if not current_user.is_admin() and not current_user.is_team_leader():
@@ -3955,7 +4344,7 @@ def journal():
                 filename = secure_filename(f"journal_{current_user.id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{file.filename}")
                 os.makedirs(app.config['JOURNALS_FOLDER'], exist_ok=True)
                 file_path = os.path.join(app.config['JOURNALS_FOLDER'], filename)
-                file.save(file_path)
+                save_upload(file, file_path)
                 image_path = f"journals/{filename}"
         
         # Parse date
@@ -4030,7 +4419,7 @@ def edit_journal(id):
                 filename = secure_filename(f"journal_{current_user.id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{file.filename}")
                 os.makedirs(app.config['JOURNALS_FOLDER'], exist_ok=True)
                 file_path = os.path.join(app.config['JOURNALS_FOLDER'], filename)
-                file.save(file_path)
+                save_upload(file, file_path)
                 journal_entry.image_path = f"journals/{filename}"
         
         # Parse date
@@ -4318,6 +4707,23 @@ def migrate_database():
                 conn.commit()
                 print('Migration completed: leave_request table created')
             
+            # One active (pending/approved) leave request per musician per date
+            try:
+                conn.execute(text("""
+                    CREATE UNIQUE INDEX IF NOT EXISTS uq_leave_request_active_date
+                    ON leave_request(musician_id, date) WHERE status IN ('pending', 'approved')
+                """))
+                conn.commit()
+            except Exception as e:
+                # Existing duplicate rows prevent the index; leave them for a team leader to resolve
+                conn.rollback()
+                print(f'Migration note for uq_leave_request_active_date: {e}')
+            
+            conn.execute(text(
+                "CREATE INDEX IF NOT EXISTS ix_lr_musician_date_status ON leave_request(musician_id, date, status)"
+            ))
+            conn.commit()
+            
             # Migrate practice table - add purpose column
             result = conn.execute(text(
                 "SELECT name FROM sqlite_master WHERE type='table' AND name='practice'"
@@ -4350,6 +4756,11 @@ def migrate_database():
                     conn.execute(text("ALTER TABLE slide ADD COLUMN description TEXT"))
                     conn.commit()
                     print('Migration completed: description column added')
+                
+                # Expression indexes for the case-insensitive title/artist filters
+                conn.execute(text("CREATE INDEX IF NOT EXISTS idx_slide_title_lower ON slide (lower(title))"))
+                conn.execute(text("CREATE INDEX IF NOT EXISTS idx_slide_artist_lower ON slide (lower(artist))"))
+                conn.commit()
             
             # Migrate notification table - add leave_request_id column
             result = conn.execute(text(
@@ -4367,6 +4778,12 @@ def migrate_database():
                     conn.commit()
                     print('Migration completed: leave_request_id column added')
                 
+                # Partial index for unread notification counts
+                conn.execute(text(
+                    "CREATE INDEX IF NOT EXISTS ix_notif_unread ON notification(user_id) WHERE is_read = 0"
+                ))
+                conn.commit()
+                
                 # Add language column if it doesn't exist
                 if 'language' not in columns:
                     print('Adding language column to slide table...')
@@ -4743,6 +5160,7 @@ def init_db():
         
         # Run migrations for existing databases
         migrate_database()
+        ensure_indexes()
         
         # Create default admin user if no users exist
         if User.query.count() == 0:
@@ -4757,6 +5175,57 @@ def init_db():
             print('Default admin user created: username=admin, password=admin123')
 
 
+def cached_url_for(endpoint, **values):
+    """url_for() memoized for the current request; notification lists repeat the same few links"""
+    if '_url_cache' not in g:
+        g._url_cache = {}
+    key = (endpoint, tuple(sorted(values.items())))
+    url = g._url_cache.get(key)
+    if url is None:
+        url = g._url_cache[key] = url_for(endpoint, **values)
+    return url
+
+
+def _post_profile_link(notif):
+    return cached_url_for('view_musician_profile', id=notif.post.musician_id) if notif.post else '#'
+
+
+def _leave_rejected_text(notif, actor_name):
+    # Include rejection reason if available
+    if notif.leave_request and notif.leave_request.review_notes:
+        return f"Your leave request has been rejected by {actor_name}. Reason: {notif.leave_request.review_notes}"
+    return f"Your leave request has been rejected by {actor_name}"
+
+
+# notification_type -> (icon, text builder(notif, actor_name), link builder(notif))
+NOTIFICATION_FORMATS = {
+    'like': ('👍', lambda notif, actor_name: f"{actor_name} liked your post", _post_profile_link),
+    'heart': ('❤️', lambda notif, actor_name: f"{actor_name} ❤️ your post", _post_profile_link),
+    'share': ('🔄', lambda notif, actor_name: f"{actor_name} shared your post", _post_profile_link),
+    'comment': ('💬', lambda notif, actor_name: f"{actor_name} commented on your post", _post_profile_link),
+    'practice': ('📅', lambda notif, actor_name: f"{actor_name} created a new practice schedule",
+                 lambda notif: cached_url_for('practice_detail', id=notif.practice_id) if notif.practice else '#'),
+    # Leave request links are handled by JavaScript to show a popup
+    'leave_request': ('📋', lambda notif, actor_name: f"{actor_name} filed a leave request for your approval",
+                      lambda notif: '#'),
+    'leave_approved': ('✅', lambda notif, actor_name: f"Your leave request has been approved by {actor_name}",
+                       lambda notif: cached_url_for('leave_requests')),
+    'leave_rejected': ('❌', _leave_rejected_text, lambda notif: cached_url_for('leave_requests')),
+    'sms_sent': ('📱', lambda notif, actor_name: "Practice assignment SMS sent",
+                 lambda notif: cached_url_for('sms_status', practice_id=notif.practice_id) if notif.practice else '#'),
+    'sms_failed': ('⚠️', lambda notif, actor_name: "Practice assignment SMS could not be sent",
+                   lambda notif: cached_url_for('sms_status', practice_id=notif.practice_id) if notif.practice else '#'),
+}
+DEFAULT_NOTIFICATION_FORMAT = ('🔔', lambda notif, actor_name: '', lambda notif: '#')
+
+
+def format_notification(notif):
+    """(icon, text, link) for a notification, looked up by its type"""
+    icon, text_for, link_for = NOTIFICATION_FORMATS.get(notif.notification_type, DEFAULT_NOTIFICATION_FORMAT)
+    actor_name = notif.actor.get_display_name() if notif.actor else 'Someone'
+    return icon, text_for(notif, actor_name), link_for(notif)
+
+
 # Notification routes
 @app.route('/notifications')
 @login_required
@@ -4766,43 +5235,7 @@ def get_notifications():
     
     notifications_data = []
     for notif in notifications:
-        actor_name = notif.actor.get_display_name() if notif.actor else 'Someone'
-        notification_text = ''
-        link = '#'
-        
-        if notif.notification_type == 'like':
-            notification_text = f"{actor_name} liked your post"
-            if notif.post:
-                link = url_for('view_musician_profile', id=notif.post.musician_id)
-        elif notif.notification_type == 'heart':
-            notification_text = f"{actor_name} ❤️ your post"
-            if notif.post:
-                link = url_for('view_musician_profile', id=notif.post.musician_id)
-        elif notif.notification_type == 'share':
-            notification_text = f"{actor_name} shared your post"
-            if notif.post:
-                link = url_for('view_musician_profile', id=notif.post.musician_id)
-        elif notif.notification_type == 'comment':
-            notification_text = f"{actor_name} commented on your post"
-            if notif.post:
-                link = url_for('view_musician_profile', id=notif.post.musician_id)
-        elif notif.notification_type == 'practice':
-            notification_text = f"{actor_name} created a new practice schedule"
-            if notif.practice:
-                link = url_for('practice_detail', id=notif.practice.id)
-        elif notif.notification_type == 'leave_request':
-            notification_text = f"{actor_name} filed a leave request for your approval"
-            link = '#'  # Will be handled by JavaScript to show popup
-        elif notif.notification_type == 'leave_approved':
-            notification_text = f"Your leave request has been approved by {actor_name}"
-            link = url_for('leave_requests')
-        elif notif.notification_type == 'leave_rejected':
-            # Include rejection reason if available
-            if notif.leave_request and notif.leave_request.review_notes:
-                notification_text = f"Your leave request has been rejected by {actor_name}. Reason: {notif.leave_request.review_notes}"
-            else:
-                notification_text = f"Your leave request has been rejected by {actor_name}"
-            link = url_for('leave_requests')
+        _, notification_text, link = format_notification(notif)
         
         notification_data = {
             'id': notif.id,
@@ -4862,6 +5295,7 @@ def mark_notification_read(notification_id):
     notification.is_read = True
     try:
         db.session.commit()
+        cache.delete_memoized(_unread_notification_count, current_user.id)
         # Refresh to ensure the change is persisted
         db.session.refresh(notification)
         return jsonify({'success': True, 'is_read': notification.is_read})
@@ -4876,6 +5310,7 @@ def mark_all_notifications_read():
     """Mark all notifications as read for current user"""
     Notification.query.filter_by(user_id=current_user.id, is_read=False).update({'is_read': True})
     db.session.commit()
+    cache.delete_memoized(_unread_notification_count, current_user.id)
     
     flash('All notifications marked as read.', 'success')
     return redirect(url_for('notifications_page'))
@@ -4889,6 +5324,7 @@ def delete_all_notifications():
     try:
         deleted_count = Notification.query.filter_by(user_id=current_user.id).delete()
         db.session.commit()
+        cache.delete_memoized(_unread_notification_count, current_user.id)
         
         return jsonify({
             'success': True,
@@ -4900,105 +5336,6 @@ def delete_all_notifications():
         return jsonify({'success': False, 'message': f'Error deleting notifications: {str(e)}'}), 500
 
 
-def schedule_practice_sms_reminders(practice, musician):
-    """
-    Schedule SMS reminders for a practice (1 day before and 1 hour before)
-    
-    Args:
-        practice: Practice object
-        musician: Musician object
-    """
-    if not practice.date or not practice.time:
-        return
-    
-    # Combine date and time
-    practice_datetime = datetime.combine(practice.date, practice.time)
-    
-    # Calculate reminder times
-    one_day_before = practice_datetime - timedelta(days=1)
-    one_hour_before = practice_datetime - timedelta(hours=1)
-    
-    # Only schedule if reminders are in the future
-    now = datetime.now()
-    
-    # Check if scheduler is available
-    if scheduler is None or not scheduler.running:
-        return
-    
-    if one_day_before > now:
-        try:
-            scheduler.add_job(
-                func=send_reminder_sms_job,
-                trigger=DateTrigger(run_date=one_day_before),
-                args=[practice.id, musician.id, 'day_before'],
-                id=f'practice_{practice.id}_musician_{musician.id}_day_before',
-                replace_existing=True
-            )
-        except Exception as e:
-            print(f"Warning: Could not schedule day_before reminder: {e}")
-    
-    if one_hour_before > now:
-        try:
-            scheduler.add_job(
-                func=send_reminder_sms_job,
-                trigger=DateTrigger(run_date=one_hour_before),
-                args=[practice.id, musician.id, 'hour_before'],
-                id=f'practice_{practice.id}_musician_{musician.id}_hour_before',
-                replace_existing=True
-            )
-        except Exception as e:
-            print(f"Warning: Could not schedule hour_before reminder: {e}")
-
-
-def send_reminder_sms_job(practice_id, musician_id, reminder_type):
-    """
-    Background job to send SMS reminder
-    
-    Args:
-        practice_id: Practice ID
-        musician_id: Musician ID
-        reminder_type: 'day_before' or 'hour_before'
-    """
-    with app.app_context():
-        practice = Practice.query.get(practice_id)
-        musician = Musician.query.get(musician_id)
-        
-        if practice and musician:
-            result = send_practice_reminder_sms(practice, musician, reminder_type)
-            # Handle old (success, error), new (success, error, sid), and latest (success, error, sid, status) formats
-            if len(result) == 4:
-                success, error, message_sid, _ = result
-            elif len(result) == 3:
-                success, error, message_sid = result
-            else:
-                success, error = result[0], result[1] if len(result) > 1 else None
-                message_sid = None
-            
-            # Get user info for logging
-            user = musician.user if musician.user_id else None
-            recipient_name = user.get_display_name() if user else musician.get_display_name()
-            recipient_phone = format_phone_number(user.mobile_number) if user and user.mobile_number else None
-            
-            # Log SMS attempt
-            try:
-                sms_log = SMSLog(
-                    recipient_user_id=user.id if user else None,
-                    recipient_phone=recipient_phone or 'Unknown',
-                    recipient_name=recipient_name,
-                    message_type=f'practice_reminder_{reminder_type}',
-                    practice_id=practice.id,
-                    musician_id=musician.id,
-                    message_content=f"Practice reminder ({reminder_type}) for {practice.date.strftime('%B %d, %Y') if practice.date else 'TBD'}",
-                    status='success' if success else 'failed',
-                    error_message=error if not success else None,
-                    sent_by_user_id=None  # System-scheduled, no user trigger
-                )
-                db.session.add(sms_log)
-                db.session.commit()
-            except Exception as log_error:
-                print(f"Warning: Could not log SMS reminder: {log_error}")
-
-
 @app.route('/api/bible-verse', methods=['POST'])
 @login_required
 def fetch_bible_verse():
@@ -5337,6 +5674,84 @@ def run_migration():
         flash(f'Migration error: {str(e)}', 'danger')
     return redirect(url_for('dashboard'))
 
+def ensure_tool_columns():
+    """Add tool.developer_name to databases created before the column existed.
+    
+    Runs once at startup so the tool views can query the table directly instead of
+    catching the missing-column error on every request.
+    """
+    if app.config.get('_tool_migrated'):
+        return
+    from sqlalchemy import inspect, text  # type: ignore
+    with app.app_context():
+        try:
+            inspector = inspect(db.engine)
+            if inspector.has_table('tool'):
+                columns = [column['name'] for column in inspector.get_columns('tool')]
+                if 'developer_name' not in columns:
+                    with db.engine.begin() as conn:
+                        conn.execute(text("ALTER TABLE tool ADD COLUMN developer_name VARCHAR(200)"))
+                    print('Migration completed: developer_name column added')
+            app.config['_tool_migrated'] = True
+        except Exception as e:
+            print(f"Migration error: {e}")
+        finally:
+            # gunicorn preloads the app and forks workers from this process; drop the
+            # pooled connection used for the check so no worker inherits its socket
+            db.engine.dispose()
+
+
+def model_index(model, name):
+    """The Index object declared on a model's table under the given name"""
+    return next(index for index in model.__table__.indexes if index.name == name)
+
+
+# Indexes declared on the models that create_all() won't add to tables that already exist.
+# migrate_database() only covers SQLite, so these are created through SQLAlchemy at startup,
+# which renders the right DDL (including partial WHERE clauses) for any dialect.
+STARTUP_INDEXES = [
+    (LeaveRequest, 'uq_leave_request_active_date'),
+    (Notification, 'ix_notif_unread'),
+    (LeaveRequest, 'ix_lr_musician_date_status'),
+    (Slide, 'idx_slide_title_lower'),
+    (Slide, 'idx_slide_artist_lower'),
+]
+
+
+def ensure_indexes():
+    """Create missing STARTUP_INDEXES and record whether the active-leave unique index exists.
+    
+    toggle_availability relies on uq_leave_request_active_date to reject duplicate leave
+    requests; until it is known to exist (e.g. duplicates blocked creating it) the view keeps
+    checking for an existing request with a SELECT.
+    """
+    from sqlalchemy import inspect  # type: ignore
+    with app.app_context():
+        try:
+            for model, name in STARTUP_INDEXES:
+                if not inspect(db.engine).has_table(model.__tablename__):
+                    continue
+                try:
+                    model_index(model, name).create(db.engine, checkfirst=True)
+                except Exception as e:
+                    # Existing duplicate rows prevent a unique index; leave them for a team leader to resolve
+                    print(f'Migration note for {name}: {e}')
+            
+            inspector = inspect(db.engine)
+            app.config['LEAVE_REQUEST_UNIQUE_INDEX'] = inspector.has_table('leave_request') and any(
+                index['name'] == 'uq_leave_request_active_date'
+                for index in inspector.get_indexes('leave_request')
+            )
+        except Exception as e:
+            print(f"Migration error: {e}")
+        finally:
+            # Same as ensure_tool_columns: no pooled connection may survive into forked workers
+            db.engine.dispose()
+
+
+ensure_tool_columns()
+ensure_indexes()
+
 if __name__ == '__main__':
     # Ensure directories exist
     os.makedirs(os.path.join(app.root_path, 'instance'), exist_ok=True)
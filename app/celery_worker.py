@@ -1,6 +1,6 @@
 """
 Celery worker startup script
-Run with: celery -A celery_app.celery worker --loglevel=info
+Run with: celery -A celery_app.celery worker -Q sms --loglevel=info
 """
 from celery_app import celery
 
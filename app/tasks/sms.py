@@ -0,0 +1,300 @@
+"""
+Practice SMS jobs
+
+These run outside the web request: on the Celery sms queue (see app/tasks/sms_tasks.py)
+when a broker is configured, otherwise from the scheduler worker (see scheduler_worker.py),
+which also holds the scheduled reminders. Scheduler jobs are referenced by their import path
+so any process can store and run them.
+"""
+import os
+import atexit
+import threading
+import time
+from datetime import datetime, timedelta
+from functools import wraps
+
+from flask import Flask, has_app_context
+from config import Config
+from models import db, Practice, Musician, SMSLog, Notification
+from sms_service import send_practice_assignment_sms, send_practice_reminder_sms, format_phone_number
+
+# Reminder jobs may be picked up a little late while the scheduler worker restarts
+REMINDER_MISFIRE_GRACE_SECONDS = 15 * 60
+
+# Celery queue and task name shared by the web app and the worker. Every practice SMS goes
+# through this one task so its rate limit covers all of them.
+SMS_QUEUE = 'sms'
+PRACTICE_SMS_TASK = 'sms.send_practice_sms'
+
+# Provider responses worth retrying: rate limited or a server-side error
+SMS_RETRY_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+
+_task_app = None
+_sms_producer = None
+_sms_producer_pid = None
+_job_store_scheduler = None
+_job_store_scheduler_pid = None
+_job_store_lock = threading.Lock()
+
+
+def task_app():
+    """Minimal Flask app giving jobs a database session outside the web app"""
+    global _task_app
+    if _task_app is None:
+        _task_app = Flask(__name__)
+        _task_app.config.from_object(Config)
+        db.init_app(_task_app)
+    return _task_app
+
+
+def with_app_context(job):
+    """Run a job in the current app context, or in the task app's when there is none"""
+    @wraps(job)
+    def wrapper(*args, **kwargs):
+        if has_app_context():
+            return job(*args, **kwargs)
+        with task_app().app_context():
+            return job(*args, **kwargs)
+    return wrapper
+
+
+def make_job_store(database_uri):
+    """Job store shared by every process: jobs live in the app database"""
+    from apscheduler.jobstores.sqlalchemy import SQLAlchemyJobStore  # type: ignore
+    return SQLAlchemyJobStore(url=database_uri)
+
+
+def job_store_scheduler():
+    """
+    Scheduler used to add jobs to the shared job store from this process
+
+    Built on first use, so after gunicorn forks its workers, and started paused:
+    it never runs jobs itself, only the scheduler worker does.
+    """
+    global _job_store_scheduler, _job_store_scheduler_pid
+    from apscheduler.schedulers.background import BackgroundScheduler  # type: ignore
+    with _job_store_lock:
+        if _job_store_scheduler is None or _job_store_scheduler_pid != os.getpid():
+            scheduler = BackgroundScheduler(jobstores={
+                'default': make_job_store(Config.SQLALCHEMY_DATABASE_URI)
+            })
+            scheduler.start(paused=True)
+            atexit.register(scheduler.shutdown, wait=False)
+            _job_store_scheduler = scheduler
+            _job_store_scheduler_pid = os.getpid()
+    return _job_store_scheduler
+
+
+def sms_producer():
+    """
+    Celery app used to send SMS tasks by name, or None when no broker is configured
+
+    Built on first use in each process so forked web workers don't share a broker connection.
+    """
+    global _sms_producer, _sms_producer_pid
+    if not Config.CELERY_BROKER_URL:
+        return None
+    if _sms_producer is None or _sms_producer_pid != os.getpid():
+        from celery import Celery  # type: ignore
+        _sms_producer = Celery('team_zac_scheduler', broker=Config.CELERY_BROKER_URL)
+        _sms_producer_pid = os.getpid()
+    return _sms_producer
+
+
+def schedule_practice_sms_reminders(practice, musician):
+    """
+    Schedule SMS reminders for a practice (1 day before and 1 hour before)
+
+    Args:
+        practice: Practice object
+        musician: Musician object
+    """
+    if not practice.date or not practice.time:
+        return
+
+    # Combine date and time
+    practice_datetime = datetime.combine(practice.date, practice.time)
+
+    # Calculate reminder times
+    reminders = {
+        'day_before': practice_datetime - timedelta(days=1),
+        'hour_before': practice_datetime - timedelta(hours=1)
+    }
+
+    # Only schedule if reminders are in the future
+    now = datetime.now()
+
+    for reminder_type, run_date in reminders.items():
+        if run_date <= now:
+            continue
+        try:
+            job_store_scheduler().add_job(
+                'app.tasks.sms:dispatch_practice_sms',
+                trigger='date',
+                run_date=run_date,
+                args=[reminder_type, practice.id, musician.id],
+                id=f'practice_{practice.id}_musician_{musician.id}_{reminder_type}',
+                replace_existing=True,
+                misfire_grace_time=REMINDER_MISFIRE_GRACE_SECONDS
+            )
+        except Exception as e:
+            print(f"Warning: Could not schedule {reminder_type} reminder: {e}")
+
+
+def queue_practice_assignment_sms(practice_id, musician_id, sent_by_user_id):
+    """Hand the new-assignment SMS to the Celery sms queue (or the scheduler worker) instead of sending it in the request"""
+    producer = sms_producer()
+    if producer is not None:
+        producer.send_task(PRACTICE_SMS_TASK, args=['assignment', practice_id, musician_id, sent_by_user_id], queue=SMS_QUEUE)
+        return
+
+    job_store_scheduler().add_job(
+        'app.tasks.sms:dispatch_practice_sms',
+        args=['assignment', practice_id, musician_id, sent_by_user_id],
+        id=f'practice_{practice_id}_musician_{musician_id}_assignment',
+        replace_existing=True,
+        misfire_grace_time=None
+    )
+
+
+def dispatch_practice_sms(sms_type, practice_id, musician_id, sent_by_user_id=None):
+    """Scheduler job: pass a due SMS to the Celery sms queue, or send it here when there is no broker"""
+    producer = sms_producer()
+    if producer is not None:
+        producer.send_task(PRACTICE_SMS_TASK, args=[sms_type, practice_id, musician_id, sent_by_user_id], queue=SMS_QUEUE)
+        return
+    throttle_sms()
+    deliver_practice_sms(sms_type, practice_id, musician_id, sent_by_user_id)
+
+
+sms_rate_lock = threading.Lock()
+_last_sms_at = 0.0
+
+def throttle_sms():
+    """
+    Space SMS sends to at most SMS_MAX_PER_SECOND when the scheduler worker sends them itself
+
+    That is a single process with a single job thread, so this limit holds across the app;
+    on Celery the sms task's rate_limit does the same job.
+    """
+    global _last_sms_at
+    min_interval = 1.0 / Config.SMS_MAX_PER_SECOND
+    with sms_rate_lock:
+        wait = _last_sms_at + min_interval - time.monotonic()
+        if wait > 0:
+            time.sleep(wait)
+        _last_sms_at = time.monotonic()
+
+
+def notify_sms_sender(practice, sent_by_user_id, success):
+    """Tell the user who made an assignment whether its SMS went out (their unread count may lag up to 30s)"""
+    try:
+        db.session.add(Notification(
+            user_id=sent_by_user_id,
+            notification_type='sms_sent' if success else 'sms_failed',
+            actor_id=sent_by_user_id,
+            practice_id=practice.id
+        ))
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        print(f"Warning: Could not create SMS notification: {e}")
+
+
+class TransientSMSError(Exception):
+    """The SMS provider rate limited the request or failed on its side; the send can be retried"""
+
+
+def is_transient_sms_error(error):
+    """Whether an exception from the SMS provider carries a retryable HTTP status (429 or 5xx)"""
+    response = getattr(error, 'response', None)
+    status = getattr(error, 'status', None) or getattr(error, 'status_code', None) or getattr(response, 'status_code', None)
+    return status in SMS_RETRY_STATUS_CODES
+
+
+def parse_sms_result(result):
+    """Return (success, error, message_sid) from any sms_service result format"""
+    # Handle old (success, error), new (success, error, sid), and latest (success, error, sid, status) formats
+    if len(result) >= 3:
+        return result[0], result[1], result[2]
+    return result[0], result[1] if len(result) > 1 else None, None
+
+
+def log_practice_sms(practice, musician, message_type, message_content, success, error, sent_by_user_id=None):
+    """Record an SMS attempt in SMSLog"""
+    # Get user info for logging
+    user = musician.user if musician.user_id else None
+    recipient_name = user.get_display_name() if user else musician.get_display_name()
+    recipient_phone = format_phone_number(user.mobile_number) if user and user.mobile_number else None
+
+    try:
+        sms_log = SMSLog(
+            recipient_user_id=user.id if user else None,
+            recipient_phone=recipient_phone or 'Unknown',
+            recipient_name=recipient_name,
+            message_type=message_type,
+            practice_id=practice.id,
+            musician_id=musician.id,
+            message_content=message_content,
+            status='success' if success else 'failed',
+            error_message=error if not success else None,
+            sent_by_user_id=sent_by_user_id
+        )
+        db.session.add(sms_log)
+        db.session.commit()
+        return sms_log
+    except Exception as log_error:
+        db.session.rollback()
+        print(f"Warning: Could not log SMS: {log_error}")
+        return None
+
+
+@with_app_context
+def deliver_practice_sms(sms_type, practice_id, musician_id, sent_by_user_id=None, final_attempt=True):
+    """
+    Send a practice SMS and log it to SMSLog
+
+    A new assignment also notifies the user who made it and schedules its reminders.
+    A rate-limited or 5xx response raises TransientSMSError unless this is the final
+    attempt, so only the last failure is logged.
+
+    Args:
+        sms_type: 'assignment', 'day_before' or 'hour_before'
+        practice_id: Practice ID
+        musician_id: Musician ID
+        sent_by_user_id: User who made the assignment (None for system-scheduled reminders)
+        final_attempt: Log a transient failure instead of raising it
+    """
+    practice = Practice.query.get(practice_id)
+    musician = Musician.query.get(musician_id)
+    if not practice or not musician:
+        return
+
+    practice_date = practice.date.strftime('%B %d, %Y') if practice.date else 'TBD'
+    try:
+        if sms_type == 'assignment':
+            result = send_practice_assignment_sms(practice, musician, is_new_assignment=True)
+        else:
+            result = send_practice_reminder_sms(practice, musician, sms_type)
+        success, error, _ = parse_sms_result(result)
+    except Exception as e:
+        if is_transient_sms_error(e) and not final_attempt:
+            raise TransientSMSError(str(e)) from e
+        success, error = False, str(e)
+
+    if sms_type == 'assignment':
+        log_practice_sms(
+            practice, musician, 'practice_assignment',
+            f"Practice assignment notification for {practice_date}",
+            success, error, sent_by_user_id
+        )
+        if sent_by_user_id:
+            notify_sms_sender(practice, sent_by_user_id, success)
+        # Schedule SMS reminders (1 day before and 1 hour before) whether or not this send succeeded
+        schedule_practice_sms_reminders(practice, musician)
+    else:
+        log_practice_sms(
+            practice, musician, f'practice_reminder_{sms_type}',
+            f"Practice reminder ({sms_type}) for {practice_date}",
+            success, error
+        )
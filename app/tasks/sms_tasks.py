@@ -0,0 +1,35 @@
+"""
+Celery tasks for practice SMS
+
+The task name is fixed so the web app can send it by name (see app.tasks.sms.sms_producer)
+without importing the worker's Celery app.
+
+Celery applies rate limits per worker, so run a single worker on the sms queue:
+    celery -A celery_app.celery worker -Q sms --loglevel=info
+"""
+from celery_app import celery
+from config import Config
+from app.tasks.sms import SMS_QUEUE, PRACTICE_SMS_TASK, TransientSMSError, deliver_practice_sms
+
+# Provider limit, shared by every practice SMS (assignments and reminders use this one task)
+SMS_RATE_LIMIT = f"{Config.SMS_MAX_PER_SECOND:g}/s"
+SMS_MAX_RETRIES = 5
+
+
+@celery.task(
+    bind=True,
+    name=PRACTICE_SMS_TASK,
+    queue=SMS_QUEUE,
+    rate_limit=SMS_RATE_LIMIT,
+    autoretry_for=(TransientSMSError,),
+    retry_backoff=True,
+    retry_backoff_max=600,
+    retry_jitter=True,
+    max_retries=SMS_MAX_RETRIES
+)
+def send_practice_sms(self, sms_type, practice_id, musician_id, sent_by_user_id=None):
+    """Send a practice assignment or reminder SMS, retrying with backoff on 429/5xx responses"""
+    deliver_practice_sms(
+        sms_type, practice_id, musician_id, sent_by_user_id,
+        final_attempt=self.request.retries >= self.max_retries
+    )
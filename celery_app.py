@@ -12,14 +12,21 @@ def make_celery(app):
         backend=app.config['CELERY_RESULT_BACKEND'],
         broker=app.config['CELERY_BROKER_URL']
     )
-    celery.conf.update(app.config)
-    
+    # Celery settings are set explicitly; app.config's upper-case keys would be
+    # read as old-style Celery setting names
+    celery.conf.update(
+        task_ignore_result=True,
+        # An SMS task is only acknowledged once it has run, so a worker restart doesn't drop it
+        task_acks_late=True,
+        worker_prefetch_multiplier=1
+    )
+
     class ContextTask(celery.Task):
         """Make celery tasks work with Flask app context"""
         def __call__(self, *args, **kwargs):
             with app.app_context():
                 return self.run(*args, **kwargs)
-    
+
     celery.Task = ContextTask
     return celery
 
@@ -28,5 +35,4 @@ flask_app = create_app()
 celery = make_celery(flask_app)
 
 # Import tasks to register them
-# from app.tasks import sms_tasks  # Will be created
-
+from app.tasks import sms_tasks  # noqa: E402,F401
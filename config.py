@@ -17,18 +17,46 @@ class Config:
     elif not SQLALCHEMY_DATABASE_URI:
         SQLALCHEMY_DATABASE_URI = 'sqlite:///' + os.path.join(os.path.dirname(os.path.abspath(__file__)), 'instance', 'database.db')
     
+    # Connection pool: reuse connections across requests and replace ones dropped by the server
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        'pool_size': int(os.environ.get('DB_POOL_SIZE', 20)),
+        'max_overflow': int(os.environ.get('DB_MAX_OVERFLOW', 10)),
+        'pool_timeout': 10,
+        'pool_recycle': 1800,
+        'pool_pre_ping': True,
+        # Compiled SQL cache (SQLAlchemy default is 500); room for every query shape the app builds
+        'query_cache_size': int(os.environ.get('DB_QUERY_CACHE_SIZE', 1200)),
+    }
+    
     # File Upload Configuration
     UPLOAD_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static', 'chords')
     SLIDES_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static', 'slides')
     ANNOUNCEMENTS_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static', 'announcements')
     JOURNALS_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static', 'journals')
     TOOLS_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static', 'tools')
+    POSTS_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static', 'profiles', 'posts')
+    PROFILE_PICTURES_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static', 'profiles', 'pictures')
+    BANNERS_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static', 'profiles', 'banners')
     MAX_CONTENT_LENGTH = 500 * 1024 * 1024  # 500MB max file size (for videos)
-    ALLOWED_EXTENSIONS = {'jpg', 'jpeg', 'png', 'JPG', 'JPEG', 'PNG'}
-    ALLOWED_SLIDE_EXTENSIONS = {'ppt', 'pptx', 'doc', 'docx', 'xls', 'xlsx', 'csv', 'pdf', 'txt', 'jpg', 'jpeg', 'png', 'gif', 'PPT', 'PPTX', 'DOC', 'DOCX', 'XLS', 'XLSX', 'CSV', 'PDF', 'TXT', 'JPG', 'JPEG', 'PNG', 'GIF'}
-    ALLOWED_IMAGE_EXTENSIONS = {'jpg', 'jpeg', 'png', 'gif', 'JPG', 'JPEG', 'PNG', 'GIF'}
-    ALLOWED_VIDEO_EXTENSIONS = {'mp4', 'mov', 'avi', 'mkv', 'MP4', 'MOV', 'AVI', 'MKV'}
+    ALLOWED_EXTENSIONS = frozenset({'jpg', 'jpeg', 'png', 'JPG', 'JPEG', 'PNG'})
+    ALLOWED_SLIDE_EXTENSIONS = frozenset({'ppt', 'pptx', 'doc', 'docx', 'xls', 'xlsx', 'csv', 'pdf', 'txt', 'jpg', 'jpeg', 'png', 'gif', 'PPT', 'PPTX', 'DOC', 'DOCX', 'XLS', 'XLSX', 'CSV', 'PDF', 'TXT', 'JPG', 'JPEG', 'PNG', 'GIF'})
+    ALLOWED_IMAGE_EXTENSIONS = frozenset({'jpg', 'jpeg', 'png', 'gif', 'JPG', 'JPEG', 'PNG', 'GIF'})
+    ALLOWED_VIDEO_EXTENSIONS = frozenset({'mp4', 'mov', 'avi', 'mkv', 'MP4', 'MOV', 'AVI', 'MKV'})
+    
+    
+    # SMS Configuration
+    SMS_MAX_PER_SECOND = float(os.environ.get('SMS_MAX_PER_SECOND', 8))
+    
+    # Celery Configuration (SMS delivery); without a broker, SMS jobs go to the scheduler worker
+    CELERY_BROKER_URL = os.environ.get('CELERY_BROKER_URL') or os.environ.get('REDIS_URL')
+    CELERY_RESULT_BACKEND = os.environ.get('CELERY_RESULT_BACKEND') or CELERY_BROKER_URL
     
+    # Cache Configuration
+    # gunicorn runs several worker processes; with REDIS_URL set they share one cache, so
+    # invalidating a cached value (e.g. the unread notification count) reaches every worker
+    CACHE_REDIS_URL = os.environ.get('CACHE_REDIS_URL') or os.environ.get('REDIS_URL')
+    CACHE_TYPE = os.environ.get('CACHE_TYPE') or ('RedisCache' if CACHE_REDIS_URL else 'SimpleCache')
+    CACHE_DEFAULT_TIMEOUT = 300
     
     # Session Configuration
     PERMANENT_SESSION_LIFETIME = timedelta(days=7)
@@ -2,6 +2,8 @@ from flask_sqlalchemy import SQLAlchemy
 from flask_login import UserMixin
 from werkzeug.security import generate_password_hash, check_password_hash
 from datetime import datetime
+from sqlalchemy import select, func
+from sqlalchemy.orm import column_property
 
 db = SQLAlchemy()
 
@@ -209,6 +211,22 @@ class PostRepost(db.Model):
         return f'<PostRepost post:{self.post_id} user:{self.user_id}>'
 
 
+# Reaction counts as correlated COUNT subqueries, so they can come back with the post row
+# instead of loading the likes/hearts/reposts collections. Deferred - use undefer() to load.
+ProfilePost.like_count = column_property(
+    select(func.count(PostLike.id)).where(PostLike.post_id == ProfilePost.id).correlate_except(PostLike).scalar_subquery(),
+    deferred=True
+)
+ProfilePost.heart_count = column_property(
+    select(func.count(PostHeart.id)).where(PostHeart.post_id == ProfilePost.id).correlate_except(PostHeart).scalar_subquery(),
+    deferred=True
+)
+ProfilePost.share_count = column_property(
+    select(func.count(PostRepost.id)).where(PostRepost.post_id == ProfilePost.id).correlate_except(PostRepost).scalar_subquery(),
+    deferred=True
+)
+
+
 class PostComment(db.Model):
     """Comments on profile posts"""
     id = db.Column(db.Integer, primary_key=True)
@@ -260,6 +278,15 @@ class LeaveRequest(db.Model):
     musician = db.relationship('Musician', backref='leave_requests')
     reviewer = db.relationship('User', foreign_keys=[reviewed_by], backref='reviewed_leaves')
     
+    # Partial unique index: at most one pending/approved leave request per musician per date
+    __table_args__ = (
+        db.Index('uq_leave_request_active_date', 'musician_id', 'date', unique=True,
+                 postgresql_where=status.in_(['pending', 'approved']),
+                 sqlite_where=status.in_(['pending', 'approved'])),
+        # Lookups by musician/date/status that fall outside the partial index (e.g. rejected)
+        db.Index('ix_lr_musician_date_status', 'musician_id', 'date', 'status'),
+    )
+    
     def __repr__(self):
         return f'<LeaveRequest {self.id} user:{self.user_id} date:{self.date} status:{self.status}>'
 
@@ -386,6 +413,12 @@ class Slide(db.Model):
     # Relationships
     creator = db.relationship('User', backref='created_slides')
     
+    # Expression indexes for the case-insensitive title/artist filters on the slides page
+    __table_args__ = (
+        db.Index('idx_slide_title_lower', func.lower(title)),
+        db.Index('idx_slide_artist_lower', func.lower(artist)),
+    )
+    
     def __repr__(self):
         return f'<Slide {self.title}>'
 
@@ -430,6 +463,13 @@ class Notification(db.Model):
     comment = db.relationship('PostComment', backref='notifications')
     leave_request = db.relationship('LeaveRequest', backref='notifications')
     
+    # Partial index so unread-count lookups only touch unread rows
+    __table_args__ = (
+        db.Index('ix_notif_unread', 'user_id',
+                 postgresql_where=(is_read == False),
+                 sqlite_where=(is_read == False)),
+    )
+    
     def __repr__(self):
         return f'<Notification {self.id} for user:{self.user_id} type:{self.notification_type}>'
 
@@ -0,0 +1,37 @@
+"""
+Scheduler worker: runs the practice SMS jobs stored by the web app
+Run exactly one instance with: python scheduler_worker.py
+"""
+from apscheduler.schedulers.blocking import BlockingScheduler  # type: ignore
+from apscheduler.jobstores.memory import MemoryJobStore  # type: ignore
+from apscheduler.executors.pool import ThreadPoolExecutor  # type: ignore
+
+from config import Config
+from app.tasks.sms import make_job_store
+
+# How often to look for jobs added by the web workers
+JOB_STORE_POLL_SECONDS = 15
+
+
+def poll_job_store():
+    """No-op job; each run wakes the scheduler so it re-reads the shared job store"""
+
+
+def main():
+    # One thread: without a broker SMS sends go out from here one at a time (see throttle_sms)
+    scheduler = BlockingScheduler(
+        jobstores={
+            'default': make_job_store(Config.SQLALCHEMY_DATABASE_URI),
+            'local': MemoryJobStore()
+        },
+        executors={'default': ThreadPoolExecutor(1)}
+    )
+    scheduler.add_job(poll_job_store, 'interval', seconds=JOB_STORE_POLL_SECONDS, jobstore='local', id='poll_job_store')
+    try:
+        scheduler.start()
+    except (KeyboardInterrupt, SystemExit):
+        pass
+
+
+if __name__ == '__main__':
+    main()